@@ -33,8 +33,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'spam_detector.middleware.ProfilingMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'spam_detector.middleware.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -68,9 +70,36 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reutilizar conexiones entre requests (segundos; 0 = cerrar en cada request)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Segundos que SQLite espera un bloqueo de escritura antes de fallar
+            'timeout': 20,
+        },
     }
 }
 
+# Réplica o conexión de solo lectura para estadísticas, historial y exportación.
+# En SQLite puede ser el mismo archivo: DB_ANALYTICS_NAME=file:/ruta/db.sqlite3?mode=ro
+if os.environ.get('DB_ANALYTICS_NAME'):
+    DATABASES['analytics'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DB_ANALYTICS_NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['spam_detector.utils.database.AnalyticsRouter']
+
+# Pragmas aplicados a cada conexión SQLite nueva (spam_detector.utils.database.configure_sqlite)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -20000,  # KiB
+    'mmap_size': 268435456,
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -95,6 +124,75 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ML Model Path
 ML_MODEL_PATH = BASE_DIR / 'modelo_spam_final.joblib'
+# Cargar y calentar el modelo al iniciar el servidor WSGI (si no, se carga en el primer request)
+ML_MODEL_PRELOAD = os.environ.get('ML_MODEL_PRELOAD', '1') == '1'
+ML_WARMUP_SAMPLES = 16
+
+# Detección de campañas casi duplicadas (MinHash/LSH en memoria, por proceso)
+CAMPAIGN_LSH_ENABLED = os.environ.get('CAMPAIGN_LSH_ENABLED', '1') == '1'
+CAMPAIGN_LSH_NUM_PERM = 128
+CAMPAIGN_LSH_BANDS = 16
+CAMPAIGN_LSH_THRESHOLD = float(os.environ.get('CAMPAIGN_LSH_THRESHOLD', '0.8'))
+CAMPAIGN_LSH_MAX_ENTRIES = int(os.environ.get('CAMPAIGN_LSH_MAX_ENTRIES', '10000'))
+CAMPAIGN_LSH_TTL_SECONDS = int(os.environ.get('CAMPAIGN_LSH_TTL_SECONDS', '3600'))
+CAMPAIGN_LSH_MIN_TOKENS = 5
+
+# Trabajos asíncronos (cola en la base de datos, procesada por manage.py run_job_worker)
+JOBS_CHUNK_SIZE = int(os.environ.get('JOBS_CHUNK_SIZE', '100'))
+JOBS_MAX_ITEMS = int(os.environ.get('JOBS_MAX_ITEMS', '10000'))
+JOBS_MAX_MEMBER_BYTES = 5 * 1024 * 1024
+# Total sin comprimir de todos los miembros de un .zip/.tar
+JOBS_MAX_ARCHIVE_BYTES = 200 * 1024 * 1024
+JOBS_MAX_RUNNING_JOBS = int(os.environ.get('JOBS_MAX_RUNNING_JOBS', '2'))
+JOBS_MAX_QUEUED_PER_CLIENT = int(os.environ.get('JOBS_MAX_QUEUED_PER_CLIENT', '5'))
+JOBS_MAX_ATTEMPTS = 3
+JOBS_CHUNK_TIMEOUT_SECONDS = 600
+JOBS_RESULT_TTL_HOURS = int(os.environ.get('JOBS_RESULT_TTL_HOURS', '24'))
+
+# IPs o rangos CIDR de los proxies cuyo X-Forwarded-For se acepta (separados por comas).
+# Detrás de un balanceador (Render) sin esto todos los clientes comparten la IP del proxy.
+TRUSTED_PROXIES = [
+    value.strip() for value in os.environ.get('TRUSTED_PROXIES', '').split(',') if value.strip()
+]
+
+# Control de admisión de los endpoints de inferencia (spam_detector.middleware).
+# Desactivado por defecto: los límites por cliente necesitan TRUSTED_PROXIES detrás de un proxy
+ADMISSION_CONTROL_ENABLED = os.environ.get('ADMISSION_CONTROL_ENABLED', '0') == '1'
+ADMISSION_PATHS = ('/api/analyze/', '/api/analyze-file/', '/api/explain/')
+ADMISSION_RATE_PER_CLIENT = float(os.environ.get('ADMISSION_RATE_PER_CLIENT', '5'))
+ADMISSION_BURST = int(os.environ.get('ADMISSION_BURST', '20'))
+ADMISSION_MAX_CONCURRENT = int(os.environ.get('ADMISSION_MAX_CONCURRENT', '4'))
+ADMISSION_MAX_QUEUE_DELAY_MS = int(os.environ.get('ADMISSION_MAX_QUEUE_DELAY_MS', '500'))
+# Compartir los límites por cliente entre workers a través de CACHES (p. ej. Redis)
+ADMISSION_SHARED_STATE = os.environ.get('ADMISSION_SHARED_STATE', '0') == '1'
+
+# Perfilado por muestreo (spam_detector.middleware.ProfilingMiddleware); GET /api/profile/
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0.01'))
+PROFILING_PATHS = ('/api/analyze/', '/api/analyze-file/', '/api/history/', '/api/statistics/')
+PROFILING_INTERVAL_MS = 5
+PROFILING_TRACEMALLOC = os.environ.get('PROFILING_TRACEMALLOC', '0') == '1'
+PROFILING_TRACEMALLOC_FRAMES = 15
+# Acceso a /api/profile/: usuarios staff o cabecera X-Profiling-Token con este valor
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')
+
+# Subida de inmails (/api/analyze-file/): se decodifican en streaming, sin archivos temporales
+INMAIL_MAX_UPLOAD_BYTES = int(os.environ.get('INMAIL_MAX_UPLOAD_BYTES', str(25 * 1024 * 1024)))
+# Texto conservado por email (cabeceras y partes de texto); el resto se descarta
+INMAIL_MAX_TEXT_CHARS = int(os.environ.get('INMAIL_MAX_TEXT_CHARS', '100000'))
+
+# Percentiles de latencia y confianza (utils.sketches): sketches por ventana y worker
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_BUCKET_SECONDS = int(os.environ.get('SKETCH_BUCKET_SECONDS', '300'))
+SKETCH_FLUSH_SECONDS = int(os.environ.get('SKETCH_FLUSH_SECONDS', '30'))
+
+# Explicaciones por token (POST /api/explain/)
+EXPLAIN_MAX_BATCH = int(os.environ.get('EXPLAIN_MAX_BATCH', '100'))
+
+# Retención del historial: manage.py archive_analyses mueve los días antiguos a ANALYSIS_ARCHIVE_DIR
+ANALYSIS_RETENTION_DAYS = int(os.environ.get('ANALYSIS_RETENTION_DAYS', '30'))
+ANALYSIS_ARCHIVE_DIR = os.environ.get('ANALYSIS_ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+ANALYSIS_ARCHIVE_BATCH_SIZE = 1000
 
 # CORS configuration for frontend
 CORS_ALLOWED_ORIGINS = [
@@ -4,3 +4,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
 
 application = get_wsgi_application()
+
+# Proceso que sirve tráfico: cargar y calentar el modelo antes del primer request
+from django.conf import settings
+
+if getattr(settings, 'ML_MODEL_PRELOAD', True):
+    from spam_detector.utils.model_loader import ensure_ready
+
+    ensure_ready()
@@ -0,0 +1,106 @@
+"""
+Benchmark del índice de campañas MinHash/LSH frente a la inferencia completa.
+Genera correos sintéticos de campañas (variando nombre, URL y algunos tokens)
+y compara el costo de firma + búsqueda LSH contra predict/predict_proba del modelo.
+
+Uso:
+    python scripts/benchmark_campaign_lsh.py [--emails 2000] [--campaigns 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import joblib
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from spam_detector.utils.campaigns import CampaignIndex  # noqa: E402
+from spam_detector.utils.ml_handler import Parser, extract_spam_keywords  # noqa: E402
+
+WORDS = (
+    'free offer money click winner prize account bank verify password urgent '
+    'limited time deal discount credit loan meeting project report schedule '
+    'team review budget invoice shipping order delivery customer support '
+    'update security notice subscription newsletter unsubscribe please thanks'
+).split()
+NAMES = ['john', 'maria', 'carlos', 'ana', 'peter', 'lucia', 'david', 'sofia']
+
+
+def make_template(rng, length=80):
+    # Vocabulario propio de cada campaña para que las plantillas no se solapen
+    vocabulary = WORDS + [
+        ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9)))
+        for _ in range(60)
+    ]
+    return [rng.choice(vocabulary) for _ in range(length)]
+
+
+def make_email(rng, template, mutations=3):
+    body = list(template)
+    for _ in range(mutations):
+        body[rng.randrange(len(body))] = rng.choice(WORDS)
+    name = rng.choice(NAMES)
+    url = f"http://promo{rng.randint(1, 9999)}.example.com/{rng.randint(1, 99999)}"
+    return (
+        f"From: {name}@example.com\nSubject: hola {name}\n\n"
+        f"Dear {name},\n{' '.join(body)}\nVisit {url}\n"
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--emails', type=int, default=2000)
+    arg_parser.add_argument('--campaigns', type=int, default=20)
+    arg_parser.add_argument('--model', default=os.path.join(BASE_DIR, 'modelo_spam_final.joblib'))
+    args = arg_parser.parse_args()
+
+    rng = random.Random(42)
+    templates = [make_template(rng) for _ in range(args.campaigns)]
+    emails = [make_email(rng, rng.choice(templates)) for _ in range(args.emails)]
+
+    parser = Parser()
+    cleaned = [parser.parse(email) for email in emails]
+    model = joblib.load(args.model)
+
+    # Inferencia completa (lo que hace predict_spam sin el índice)
+    start = time.perf_counter()
+    for text in cleaned:
+        prediction = model.predict([text])[0]
+        model.predict_proba([text])
+        extract_spam_keywords(text, model, 'spam' if prediction == 1 else 'ham')
+    inference_ms = (time.perf_counter() - start) * 1000 / len(cleaned)
+
+    # Firma MinHash + búsqueda LSH (+ inserción en caso de fallo)
+    index = CampaignIndex()
+    hits = 0
+    start = time.perf_counter()
+    for text in cleaned:
+        signature = index.signature(set(text.split()))
+        if index.lookup(signature) is not None:
+            hits += 1
+        else:
+            index.add(signature, {'prediction': 'spam', 'confidence': 99.0, 'spam_keywords': []})
+    lsh_ms = (time.perf_counter() - start) * 1000 / len(cleaned)
+
+    stats = index.cluster_sizes(limit=5)
+
+    print("=" * 60)
+    print("BENCHMARK MINHASH/LSH vs INFERENCIA COMPLETA")
+    print("=" * 60)
+    print(f"Correos: {len(cleaned)}  Campañas sintéticas: {args.campaigns}")
+    print(f"Inferencia completa:   {inference_ms:.3f} ms/correo")
+    print(f"Firma + búsqueda LSH:  {lsh_ms:.3f} ms/correo")
+    print(f"Aceleración:           {inference_ms / lsh_ms:.1f}x")
+    print(f"Aciertos LSH:          {hits} ({hits / len(cleaned):.1%})")
+    print(f"Entradas en índice:    {stats['tracked_emails']}")
+    print(f"Campañas activas:      {stats['active_campaigns']}")
+    for campaign in stats['top_campaigns']:
+        print(f"  - {campaign['campaign_id']}: {campaign['size']} correos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark de la capa de base de datos bajo carga mixta: hilos que insertan
+análisis (como /api/analyze/) mientras otros leen /api/statistics/ y /api/history/.
+
+Compara tres configuraciones, cada una en un proceso y una base SQLite temporal:
+
+- base:     journal DELETE, sin pragmas, una conexión nueva por request (CONN_MAX_AGE=0)
+- wal:      WAL + SQLITE_PRAGMAS + conexiones persistentes (configuración por defecto)
+- wal+ro:   lo anterior + lecturas analíticas por una conexión de solo lectura (DB_ANALYTICS_NAME)
+
+Uso:
+    python scripts/benchmark_database.py [--seconds 5] [--writers 4] [--readers 4] [--rows 20000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+MODES = ('base', 'wal', 'wal+ro')
+
+
+def setup_django(mode, db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+    if mode == 'base':
+        os.environ['DB_CONN_MAX_AGE'] = '0'
+    if mode == 'wal+ro':
+        os.environ['DB_ANALYTICS_NAME'] = f'file:{db_path}?mode=ro'
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    if mode == 'base':
+        settings.SQLITE_PRAGMAS = {'journal_mode': 'DELETE'}
+
+    import django
+    django.setup()
+
+
+def populate(rows):
+    from spam_detector.models import DailyPredictionCount, EmailAnalysis, EmailContent
+
+    contents = [EmailContent.store(f'correo de prueba número {i} oferta gratis') for i in range(200)]
+    EmailAnalysis.objects.bulk_create([
+        EmailAnalysis(
+            content=contents[i % len(contents)],
+            prediction='spam' if i % 3 else 'ham',
+            confidence=0.9,
+            latency_ms=5.0,
+        )
+        for i in range(rows)
+    ], batch_size=5000)
+    DailyPredictionCount.rebuild()
+
+
+def run_load(seconds, writers, readers):
+    from django.db import close_old_connections
+    from django.test import Client
+    from spam_detector.models import EmailAnalysis
+
+    stop = threading.Event()
+    counts = {'writes': 0, 'reads': 0, 'write_errors': 0, 'read_errors': 0}
+    lock = threading.Lock()
+
+    def add(key):
+        with lock:
+            counts[key] += 1
+
+    def writer(n):
+        result = {'prediction': 'spam', 'confidence': 95.0, 'latency': 4.0}
+        i = 0
+        while not stop.is_set():
+            try:
+                EmailAnalysis.record_prediction(f'campaña {n}-{i} dinero fácil', result, '127.0.0.1', 'bench')
+                add('writes')
+            except Exception:
+                add('write_errors')
+            # Fin de "request": respeta CONN_MAX_AGE igual que el ciclo de Django
+            close_old_connections()
+            i += 1
+
+    def reader(n):
+        client = Client()
+        urls = ['/api/statistics/', '/api/history/?limit=20&preview=0', '/api/history/?limit=20']
+        i = n
+        while not stop.is_set():
+            response = client.get(urls[i % len(urls)])
+            add('reads' if response.status_code == 200 else 'read_errors')
+            i += 1
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {key: value / seconds if key in ('writes', 'reads') else value for key, value in counts.items()}
+
+
+def run_mode(args):
+    db_path = os.path.join(tempfile.mkdtemp(prefix='db-bench-'), 'bench.sqlite3')
+    setup_django(args.mode, db_path)
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command('migrate', verbosity=0)
+    populate(args.rows)
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+    connection.close()
+
+    result = run_load(args.seconds, args.writers, args.readers)
+    result['journal_mode'] = journal_mode
+    print(json.dumps(result))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--seconds', type=float, default=5)
+    arg_parser.add_argument('--writers', type=int, default=4)
+    arg_parser.add_argument('--readers', type=int, default=4)
+    arg_parser.add_argument('--rows', type=int, default=20000)
+    arg_parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode,
+             '--seconds', str(args.seconds), '--writers', str(args.writers),
+             '--readers', str(args.readers), '--rows', str(args.rows)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print("=" * 60)
+    print("BENCHMARK DE BASE DE DATOS BAJO CARGA MIXTA")
+    print("=" * 60)
+    print(f"Filas iniciales: {args.rows}  Escritores: {args.writers}  Lectores: {args.readers}  "
+          f"Duración: {args.seconds:.0f} s")
+    print(f"{'Modo':<8} {'journal':<8} {'Inserts/s':>10} {'Lecturas/s':>11} {'Err. escr.':>11} {'Err. lect.':>11}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['journal_mode']:<8} {r['writes']:>10.1f} {r['reads']:>11.1f} "
+              f"{r['write_errors']:>11} {r['read_errors']:>11}")
+
+
+if __name__ == '__main__':
+    main()
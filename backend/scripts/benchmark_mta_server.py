@@ -0,0 +1,143 @@
+"""
+Benchmark del servidor de filtrado para el MTA frente al endpoint HTTP /api/analyze/.
+Levanta ambos servidores en este mismo proceso (con una base de datos temporal)
+y mide mensajes/segundo clasificando el mismo conjunto de correos sintéticos.
+
+Uso:
+    python scripts/benchmark_mta_server.py [--messages 500] [--transport unix|tcp]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+WORDS = (
+    'free offer money click winner prize account bank verify password urgent '
+    'limited time deal discount credit loan meeting project report schedule '
+    'team review budget invoice shipping order delivery customer support'
+).split()
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+    # Medir siempre el camino del modelo, sin atajos por campañas duplicadas
+    os.environ['CAMPAIGN_LSH_ENABLED'] = '0'
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def make_messages(count):
+    rng = random.Random(42)
+    return [
+        (
+            f"From: user{i}@example.com\nSubject: mensaje {i}\n\n"
+            + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(40, 200)))
+        ).encode('utf-8')
+        for i in range(count)
+    ]
+
+
+def start_http_server():
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+    from django.core.wsgi import get_wsgi_application
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+    server.set_app(get_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_http(port, messages):
+    start = time.perf_counter()
+    for message in messages:
+        # Una conexión por mensaje, como hace hoy la integración del MTA
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        conn.request(
+            'POST', '/api/analyze/',
+            body=json.dumps({'email_text': message.decode('utf-8')}),
+            headers={'Content-Type': 'application/json'}
+        )
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        if response.status != 200:
+            raise RuntimeError(f'HTTP {response.status}')
+    return len(messages) / (time.perf_counter() - start)
+
+
+def bench_filter(client_kwargs, messages):
+    from spam_detector.utils.mta_protocol import FilterClient
+
+    with FilterClient(**client_kwargs) as client:
+        start = time.perf_counter()
+        results = client.classify_many(messages)
+        elapsed = time.perf_counter() - start
+    if any(r.get('prediction') == 'error' for r in results):
+        raise RuntimeError('El servidor de filtrado devolvió errores')
+    return len(messages) / elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--messages', type=int, default=500)
+    arg_parser.add_argument('--transport', choices=['unix', 'tcp'], default='unix')
+    args = arg_parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='mta-bench-')
+    setup_django(os.path.join(tmp_dir, 'bench.sqlite3'))
+
+    from spam_detector.utils.mta_protocol import TCPFilterServer, UnixFilterServer
+
+    messages = make_messages(args.messages)
+
+    http_server = start_http_server()
+    if args.transport == 'unix':
+        socket_path = os.path.join(tmp_dir, 'filter.sock')
+        filter_server = UnixFilterServer(socket_path)
+        client_kwargs = {'unix_path': socket_path}
+    else:
+        filter_server = TCPFilterServer(('127.0.0.1', 0))
+        client_kwargs = {'port': filter_server.server_address[1]}
+    threading.Thread(target=filter_server.serve_forever, daemon=True).start()
+
+    # Calentamiento
+    bench_http(http_server.server_address[1], messages[:20])
+    bench_filter(client_kwargs, messages[:20])
+
+    http_rate = bench_http(http_server.server_address[1], messages)
+    filter_rate = bench_filter(client_kwargs, messages)
+
+    http_server.shutdown()
+    filter_server.shutdown()
+
+    print("=" * 60)
+    print("BENCHMARK SERVIDOR DE FILTRADO vs HTTP /api/analyze/")
+    print("=" * 60)
+    print(f"Mensajes:                {len(messages)}")
+    print(f"HTTP (1 conexión/msg):   {http_rate:.1f} msg/s")
+    print(f"Filtro ({args.transport}, pipeline): {filter_rate:.1f} msg/s")
+    print(f"Aceleración:             {filter_rate / http_rate:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
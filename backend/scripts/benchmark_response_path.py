@@ -0,0 +1,153 @@
+"""
+Benchmark del camino de respuesta de los endpoints de alto tráfico.
+
+1. Componentes: PredictionResponseSerializer(data=...).is_valid() + .data + JSONRenderer
+   (camino anterior) frente a PredictionResult.to_dict() + FastJSONRenderer.
+2. Extremo a extremo con el cliente de pruebas de Django: /api/analyze/ (con acierto en
+   el índice de campañas, para que domine el costo por request y no el modelo) y
+   /api/history/, con los renderers/negociación por defecto de DRF frente a los rápidos.
+
+Uso:
+    python scripts/benchmark_response_path.py [--requests 2000] [--rows 5000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+EMAIL = (
+    "Subject: Oferta\n\nCongratulations winner! Click here to claim your free prize money now, "
+    "limited offer, act now and get your cash bonus today"
+)
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+
+    import django
+    django.setup()
+
+
+def per_call_us(func, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def bench_components(n):
+    from rest_framework import serializers
+    from rest_framework.renderers import JSONRenderer
+    from spam_detector.renderers import FastJSONRenderer
+    from spam_detector.utils.ml_handler import PredictionResult
+
+    class PredictionResponseSerializer(serializers.Serializer):
+        # Copia del serializer que usaba /api/analyze/ antes del camino rápido
+        prediction = serializers.CharField()
+        confidence = serializers.FloatField()
+        latency = serializers.FloatField()
+        cleaned_text = serializers.CharField(required=False)
+        spam_keywords = serializers.ListField(child=serializers.CharField(), required=False)
+        campaign_id = serializers.CharField(required=False)
+        error = serializers.CharField(required=False)
+
+    result = PredictionResult(
+        'spam', confidence=97.31, latency=3.52,
+        spam_keywords=['free', 'winner', 'click', 'prize', 'money', 'cash', 'bonus'],
+        cleaned_text='congratulations winner click here to claim your free prize money now' * 2,
+    )
+    json_renderer = JSONRenderer()
+    fast_renderer = FastJSONRenderer()
+
+    def old_path():
+        serializer = PredictionResponseSerializer(data=result.to_dict())
+        serializer.is_valid()
+        json_renderer.render(serializer.data)
+
+    def new_path():
+        fast_renderer.render(result.to_dict())
+
+    return per_call_us(old_path, n), per_call_us(new_path, n)
+
+
+def bench_endpoints(n):
+    from django.test import Client
+    from rest_framework.settings import api_settings
+    from spam_detector import views
+
+    client = Client()
+    hot_views = [views.SpamDetectorAPIView, views.HistoryAPIView]
+    fast = {view: (view.renderer_classes, view.content_negotiation_class) for view in hot_views}
+
+    def use_defaults(enabled):
+        for view in hot_views:
+            if enabled:
+                view.renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+                view.content_negotiation_class = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS
+            else:
+                view.renderer_classes, view.content_negotiation_class = fast[view]
+
+    def analyze():
+        response = client.post('/api/analyze/', {'email_text': EMAIL}, content_type='application/json')
+        assert response.status_code == 200, response.content
+
+    def history():
+        response = client.get('/api/history/?limit=50&preview=1', HTTP_ACCEPT='application/json')
+        assert response.status_code == 200, response.content
+
+    # Calentamiento: llena el índice de campañas
+    analyze()
+
+    results = {}
+    for name, func in (('analyze', analyze), ('history', history)):
+        use_defaults(True)
+        default_us = per_call_us(func, n)
+        use_defaults(False)
+        fast_us = per_call_us(func, n)
+        results[name] = (default_us, fast_us)
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--requests', type=int, default=2000)
+    arg_parser.add_argument('--rows', type=int, default=5000)
+    args = arg_parser.parse_args()
+
+    setup_django(os.path.join(tempfile.mkdtemp(prefix='response-bench-'), 'bench.sqlite3'))
+
+    from django.core.management import call_command
+    from spam_detector.models import EmailAnalysis, EmailContent
+
+    call_command('migrate', verbosity=0)
+    content = EmailContent.store(EMAIL)
+    EmailAnalysis.objects.bulk_create([
+        EmailAnalysis(content=content, prediction='spam', confidence=0.97, latency_ms=3.5)
+        for _ in range(args.rows)
+    ], batch_size=5000)
+
+    old_us, new_us = bench_components(args.requests * 5)
+    endpoints = bench_endpoints(args.requests)
+
+    print("=" * 60)
+    print("BENCHMARK DEL CAMINO DE RESPUESTA")
+    print("=" * 60)
+    print("Serialización de un resultado de predicción:")
+    print(f"  Serializer + JSONRenderer:    {old_us:8.1f} µs")
+    print(f"  to_dict + FastJSONRenderer:   {new_us:8.1f} µs ({old_us / new_us:.1f}x)")
+    print(f"\nPor request con el cliente de pruebas ({args.requests} requests):")
+    for name, (default_us, fast_us) in endpoints.items():
+        print(f"  {name:<8} DRF por defecto: {default_us / 1000:7.3f} ms   "
+              f"rápido: {fast_us / 1000:7.3f} ms   (-{default_us - fast_us:.0f} µs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark de búsqueda en el historial: LIKE '%...%' (esquema anterior, email_content
+en email_analysis) frente al índice FTS5 sobre contenidos deduplicados.
+
+Construye ambas tablas en una base SQLite temporal con el mismo conjunto sintético
+y mide la primera página de resultados (20) y el conteo total para términos
+frecuentes y raros. La búsqueda FTS usa search.search_analyses, igual que
+/api/history/?q=.
+
+Uso:
+    python scripts/benchmark_search.py [--rows 1000000] [--unique 200000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+
+WORDS = (
+    'free offer money click winner prize account bank verify password urgent '
+    'limited time deal discount credit loan meeting project report schedule '
+    'team review budget invoice shipping order delivery customer support '
+    'update security notice subscription newsletter unsubscribe please thanks'
+).split()
+RARE_WORD = 'zyxwquark'
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+
+    import django
+    django.setup()
+
+
+def build(db_path, rows, unique):
+    from spam_detector.utils.search import FTS_TABLE
+
+    rng = random.Random(42)
+    contents = []
+    for i in range(unique):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(20, 60))]
+        if i % 5000 == 0:
+            words.append(RARE_WORD)
+        contents.append(' '.join(words))
+
+    db = sqlite3.connect(db_path)
+    db.executescript(f"""
+        PRAGMA journal_mode=OFF;
+        PRAGMA synchronous=OFF;
+        CREATE TABLE old_analysis (id INTEGER PRIMARY KEY, email_content TEXT, created_at TEXT);
+        CREATE INDEX old_created ON old_analysis (created_at);
+        CREATE TABLE email_analysis (id INTEGER PRIMARY KEY, content_id INTEGER, created_at TEXT);
+        CREATE INDEX new_content ON email_analysis (content_id);
+        CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+            content, content='', tokenize='unicode61 remove_diacritics 2');
+    """)
+    db.executemany(f"INSERT INTO {FTS_TABLE} (rowid, content) VALUES (?, ?)",
+                   ((i + 1, text) for i, text in enumerate(contents)))
+
+    batch_old, batch_new = [], []
+    for i in range(rows):
+        content_id = rng.randrange(unique)
+        created_at = f"2026-01-01 00:00:{i:09d}"
+        batch_old.append((i + 1, contents[content_id], created_at))
+        batch_new.append((i + 1, content_id + 1, created_at))
+        if len(batch_old) >= 50000:
+            db.executemany("INSERT INTO old_analysis VALUES (?, ?, ?)", batch_old)
+            db.executemany("INSERT INTO email_analysis VALUES (?, ?, ?)", batch_new)
+            batch_old, batch_new = [], []
+    db.executemany("INSERT INTO old_analysis VALUES (?, ?, ?)", batch_old)
+    db.executemany("INSERT INTO email_analysis VALUES (?, ?, ?)", batch_new)
+    db.commit()
+    return db
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--rows', type=int, default=1000000)
+    arg_parser.add_argument('--unique', type=int, default=200000)
+    args = arg_parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='search-bench-'), 'search.sqlite3')
+    print(f"Construyendo {args.rows} análisis ({args.unique} contenidos únicos)...")
+    setup_django(db_path)
+    db = build(db_path, args.rows, args.unique)
+
+    from spam_detector.utils import search
+
+    like_page = "SELECT id FROM old_analysis WHERE email_content LIKE ? ORDER BY created_at DESC LIMIT 20"
+    like_count = "SELECT COUNT(*) FROM old_analysis WHERE email_content LIKE ?"
+    fts_count = (
+        f"SELECT COUNT(*) FROM email_analysis WHERE content_id IN "
+        f"(SELECT rowid FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH ?)"
+    )
+
+    print("=" * 84)
+    print(f"{'Término':<16}{'LIKE pág.':>12}{'FTS pág.1':>12}{'FTS pág.2':>12}{'LIKE count':>14}{'FTS count':>14}")
+    print("=" * 84)
+    for term in ('budget', 'winner prize', RARE_WORD):
+        like_term = f"%{term}%"
+        like_page_ms, _ = timed(lambda: db.execute(like_page, [like_term]).fetchall())
+        fts_page_ms, (_, next_cursor) = timed(lambda: search.search_analyses(term, limit=20))
+        fts_next_ms, _ = timed(lambda: search.search_analyses(term, limit=20, cursor=next_cursor))
+        like_count_ms, like_total = timed(lambda: db.execute(like_count, [like_term]).fetchone()[0])
+        fts_count_ms, fts_total = timed(lambda: db.execute(fts_count, [search.to_fts_query(term)]).fetchone()[0])
+        print(f"{term:<16}{like_page_ms:>10.1f}ms{fts_page_ms:>10.1f}ms{fts_next_ms:>10.1f}ms"
+              f"{like_count_ms:>12.1f}ms{fts_count_ms:>12.1f}ms")
+        print(f"{'':<16}coincidencias: LIKE={like_total} FTS={fts_total}")
+    print("\nNota: LIKE busca subcadenas ('winner prize' literal); FTS busca ambas palabras.")
+
+
+if __name__ == '__main__':
+    main()
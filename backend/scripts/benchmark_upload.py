@@ -0,0 +1,145 @@
+"""
+Benchmark de la subida de inmails a /api/analyze-file/: handlers por defecto de Django
+(memoria o archivo temporal) + read() + decode_inmail, frente a
+InmailStreamingUploadHandler, que decodifica mientras llegan los chunks.
+
+El cuerpo multipart se genera al vuelo (un email con una parte de texto y un adjunto
+base64 de --sizes MB), así que el script no lo tiene entero en memoria. Se mide el
+pico de memoria (tracemalloc) y el tiempo de parseo + decodificación.
+
+Uso:
+    python scripts/benchmark_upload.py [--sizes 1,10,50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+BOUNDARY = 'form-boundary-1234'
+MIME_BOUNDARY = 'mime-boundary-5678'
+BASE64_LINE = b'QUJDREVGR0hJSktMTU5PUFFSU1RVVldYWVphYmNkZWZnaGlqa2xtbm9wcXJzdHV2d3h5ejAxMjM0\n'
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+
+    import django
+    django.setup()
+
+
+class GeneratedBody:
+    """Cuerpo multipart/form-data generado al leer, sin materializarlo."""
+
+    def __init__(self, attachment_bytes):
+        head = (
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="inmail.1"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'
+            f'From: promo@example.com\nSubject: oferta\nMIME-Version: 1.0\n'
+            f'Content-Type: multipart/mixed; boundary="{MIME_BOUNDARY}"\n\n'
+            f'--{MIME_BOUNDARY}\nContent-Type: text/plain\n\n'
+            + 'free money click winner prize offer now\n' * 50
+            + f'--{MIME_BOUNDARY}\nContent-Type: application/pdf\nContent-Disposition: attachment; '
+            f'filename="doc.pdf"\nContent-Transfer-Encoding: base64\n\n'
+        ).encode('utf-8')
+        tail = f'--{MIME_BOUNDARY}--\n\r\n--{BOUNDARY}--\r\n'.encode('utf-8')
+        lines = attachment_bytes // len(BASE64_LINE)
+        self.length = len(head) + lines * len(BASE64_LINE) + len(tail)
+        self._pieces = self._generate(head, lines, tail)
+        self._pending = b''
+
+    @staticmethod
+    def _generate(head, lines, tail):
+        yield head
+        while lines > 0:
+            count = min(1024, lines)
+            lines -= count
+            yield BASE64_LINE * count
+        yield tail
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            piece = next(self._pieces, None)
+            if piece is None:
+                break
+            self._pending += piece
+        if size < 0:
+            data, self._pending = self._pending, b''
+        else:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+def parse(body, handlers):
+    from django.http.multipartparser import MultiPartParser
+
+    meta = {'CONTENT_TYPE': f'multipart/form-data; boundary={BOUNDARY}', 'CONTENT_LENGTH': str(body.length)}
+    return MultiPartParser(meta, body, handlers).parse()
+
+
+def run_default(size):
+    from django.core.files.uploadhandler import load_handler
+    from django.conf import settings
+    from spam_detector.utils.inmail import decode_inmail
+
+    body = GeneratedBody(size)
+    handlers = [load_handler(path) for path in settings.FILE_UPLOAD_HANDLERS]
+    _, files = parse(body, handlers)
+    uploaded = files['file']
+    text = decode_inmail(uploaded.read())
+    temporary = hasattr(uploaded, 'temporary_file_path')
+    uploaded.close()
+    return len(text), temporary
+
+
+def run_streaming(size):
+    from spam_detector.uploadhandlers import InmailStreamingUploadHandler
+
+    body = GeneratedBody(size)
+    handler = InmailStreamingUploadHandler()
+    _, files = parse(body, [handler])
+    uploaded = files['file']
+    return len(uploaded.read()), False
+
+
+def measure(func, size):
+    tracemalloc.start()
+    start = time.perf_counter()
+    chars, temporary = func(size)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': elapsed, 'peak': peak, 'chars': chars, 'temporary': temporary}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--sizes', default='1,10,50', help='Tamaños del adjunto en MB')
+    args = arg_parser.parse_args()
+
+    setup_django(os.path.join(tempfile.mkdtemp(prefix='upload-bench-'), 'bench.sqlite3'))
+    from django.conf import settings
+    settings.INMAIL_MAX_UPLOAD_BYTES = 1024 * 1024 * 1024
+
+    print("=" * 60)
+    print("BENCHMARK: SUBIDA DE INMAILS")
+    print("=" * 60)
+    print(f"{'Adjunto':>8} {'Modo':<11} {'Tiempo ms':>10} {'Pico MB':>9} {'Texto':>10} {'Temporal':>9}")
+    for size_mb in (float(value) for value in args.sizes.split(',')):
+        size = int(size_mb * 1024 * 1024)
+        for name, func in (('defecto', run_default), ('streaming', run_streaming)):
+            r = measure(func, size)
+            print(f"{size_mb:>6g}MB {name:<11} {r['seconds'] * 1000:>10.1f} {r['peak'] / 1024 / 1024:>9.2f} "
+                  f"{r['chars']:>10} {'sí' if r['temporary'] else 'no':>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Verifica la precisión de los percentiles de utils.sketches frente a los exactos.
+
+Genera latencias (lognormal con cola pesada) y confianzas sintéticas, las reparte
+entre --workers workers y ventanas de SKETCH_BUCKET_SECONDS, guarda un sketch por
+ventana y worker en LatencySketch (base de datos temporal) y consulta
+sketches.merged_sketches para varios rangos. Cada percentil se compara con
+el valor exacto de los mismos datos: el error relativo debe ser ≤ α
+(SKETCH_RELATIVE_ACCURACY). Se repite tras compactar (sketches.compact), que no
+debe cambiar ningún resultado. Termina con código 1 si alguno falla.
+
+Uso:
+    python scripts/check_sketch_accuracy.py [--values 200000] [--workers 4] [--hours 48]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+
+    import django
+    django.setup()
+
+
+def generate(rng, n, hours):
+    # Latencia: cuerpo lognormal (~5 ms) y 2% de cola lenta (~200 ms)
+    latency = rng.lognormal(np.log(5), 0.5, n)
+    slow = rng.random(n) < 0.02
+    latency[slow] = rng.lognormal(np.log(200), 0.8, slow.sum())
+    confidence = 50 + 50 * rng.beta(5, 1.5, n)
+    offsets = np.sort(rng.uniform(0, hours * 3600, n))
+    return latency, confidence, offsets
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--values', type=int, default=200000)
+    arg_parser.add_argument('--workers', type=int, default=4)
+    arg_parser.add_argument('--hours', type=float, default=48)
+    arg_parser.add_argument('--seed', type=int, default=42)
+    args = arg_parser.parse_args()
+
+    setup_django(os.path.join(tempfile.mkdtemp(prefix='sketch-accuracy-'), 'sketch.sqlite3'))
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from spam_detector.models import LatencySketch
+    from spam_detector.utils import sketches
+
+    call_command('migrate', verbosity=0)
+    alpha = settings.SKETCH_RELATIVE_ACCURACY
+    bucket_seconds = settings.SKETCH_BUCKET_SECONDS
+
+    rng = np.random.default_rng(args.seed)
+    latency, confidence, offsets = generate(rng, args.values, args.hours)
+    workers = rng.integers(0, args.workers, args.values)
+    origin = sketches.bucket_start(datetime.now(dt_timezone.utc) - timedelta(hours=args.hours), bucket_seconds)
+    moments = [origin + timedelta(seconds=float(offset)) for offset in offsets]
+
+    # Un sketch por (ventana, métrica, worker), como los que guarda cada proceso
+    start_build = time.perf_counter()
+    built = {}
+    for moment, worker, lat, conf in zip(moments, workers, latency, confidence):
+        start = sketches.bucket_start(moment, bucket_seconds)
+        for metric, value in (('latency_ms', lat), ('confidence', conf)):
+            key = (start, metric, int(worker))
+            sketch = built.get(key)
+            if sketch is None:
+                sketch = built[key] = sketches.DDSketch(alpha)
+            sketch.add(float(value))
+    LatencySketch.objects.bulk_create([
+        LatencySketch(bucket_start=start, metric=metric, worker=f'worker-{worker}',
+                      count=sketch.count, sketch=sketch.to_dict())
+        for (start, metric, worker), sketch in built.items()
+    ], batch_size=500)
+    build_seconds = time.perf_counter() - start_build
+
+    end_all = origin + timedelta(hours=args.hours + 1)
+    windows = [
+        ('todo', origin, end_all),
+        ('últimas 24 h', end_all - timedelta(hours=25), end_all),
+        ('1 hora', origin + timedelta(hours=3), origin + timedelta(hours=4)),
+    ]
+
+    print("=" * 60)
+    print("PRECISIÓN DE PERCENTILES (SKETCHES MERGEABLES)")
+    print("=" * 60)
+    print(f"Valores: {args.values}  Workers: {args.workers}  Ventana: {bucket_seconds} s  α: {alpha}")
+    print(f"Filas LatencySketch: {len(built)} (construidas y guardadas en {build_seconds:.1f} s)")
+
+    offsets_dt = np.array([m.timestamp() for m in moments])
+    failures = 0
+    answers = {}
+    for phase in ('por worker', 'compactado'):
+        if phase == 'compactado':
+            removed = sketches.compact(end_all)
+            print(f"\nCompactado: {removed} filas eliminadas, quedan {LatencySketch.objects.count()}")
+        for label, start, end in windows:
+            # Rangos alineados a ventanas: los exactos usan las mismas ventanas completas
+            aligned_start = sketches.bucket_start(start, bucket_seconds).timestamp()
+            mask = (offsets_dt >= aligned_start) & (offsets_dt < end.timestamp())
+
+            query_start = time.perf_counter()
+            merged = sketches.merged_sketches(start, end)
+            query_ms = (time.perf_counter() - query_start) * 1000
+
+            print(f"\n[{phase}] Rango: {label} ({mask.sum()} valores, consulta {query_ms:.1f} ms)")
+            print(f"{'Métrica':<12} {'Cuantil':>8} {'Exacto':>10} {'Sketch':>10} {'Error rel.':>11}")
+            for metric, values in (('latency_ms', latency[mask]), ('confidence', confidence[mask])):
+                sketch = merged[metric]
+                if sketch.count != len(values):
+                    print(f"❌ {metric}: el sketch tiene {sketch.count} valores, se esperaban {len(values)}")
+                    failures += 1
+                    continue
+                ordered = np.sort(values)
+                for q in QUANTILES:
+                    # Mismo criterio de rango que DDSketch.quantile (rank = q * (n - 1), sin interpolar)
+                    exact = float(ordered[int(q * (len(values) - 1))])
+                    estimate = sketch.quantile(q)
+                    error = abs(estimate - exact) / exact
+                    mark = '' if error <= alpha + 1e-9 else '  ❌'
+                    # Compactar no debe cambiar la respuesta
+                    previous = answers.setdefault((label, metric, q), estimate)
+                    if abs(previous - estimate) > 1e-9:
+                        mark += '  ❌ cambió al compactar'
+                    failures += bool(mark)
+                    print(f"{metric:<12} {'p' + format(q * 100, 'g'):>8} {exact:>10.3f} {estimate:>10.3f} "
+                          f"{error * 100:>10.3f}%{mark}")
+
+    print()
+    if failures:
+        print(f"❌ {failures} percentiles fuera del error relativo {alpha}")
+        sys.exit(1)
+    print(f"✅ Todos los percentiles dentro del error relativo {alpha}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""
+Generador de carga de lazo abierto contra la API en ejecución (runserver o gunicorn).
+
+Los requests llegan a una tasa fija (--rate, llegadas de Poisson o constantes) sin
+esperar a que terminen los anteriores, como el tráfico real: si el servidor se
+satura la latencia crece en lugar de bajar la tasa. La latencia se mide desde el
+instante programado de cada llegada.
+
+El cuerpo de los emails sale de un index estilo TREC (--trec-index) o de una mezcla
+sintética de correos de texto plano, HTML y con adjuntos (--mix). Cliente HTTP/1.1
+mínimo sobre asyncio: no requiere dependencias externas.
+
+Uso:
+    python scripts/load_generator.py --url http://127.0.0.1:8000 --rate 20 --duration 30
+    python scripts/load_generator.py --trec-index ../data/trec07p/full/index \\
+        --endpoints analyze=0.5,analyze-file=0.3,statistics=0.1,history=0.1
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from urllib.parse import urlsplit
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+ENDPOINTS = {
+    'analyze': ('POST', '/api/analyze/'),
+    'analyze-file': ('POST', '/api/analyze-file/'),
+    'statistics': ('GET', '/api/statistics/'),
+    'history': ('GET', '/api/history/?limit=20'),
+}
+
+# EmailAnalysisSerializer.email_text: los emails más largos solo van a analyze-file
+ANALYZE_MAX_CHARS = 50000
+
+WORDS = (
+    'free offer money click winner prize account bank verify password urgent '
+    'limited time deal discount credit loan meeting project report schedule '
+    'team review budget invoice shipping order delivery customer support '
+    'update security notice subscription newsletter unsubscribe please thanks'
+).split()
+
+
+def parse_weights(value, allowed):
+    """'a=0.5,b=0.5' -> {'a': 0.5, 'b': 0.5}"""
+    weights = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in allowed:
+            raise SystemExit(f'Opción desconocida: {name} (válidas: {", ".join(allowed)})')
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def synthetic_email(rng, kind):
+    subject = ' '.join(rng.choice(WORDS) for _ in range(4))
+    body = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(40, 300)))
+    headers = f"From: user{rng.randint(1, 9999)}@example.com\nSubject: {subject}\n"
+
+    if kind == 'plain':
+        return f"{headers}Content-Type: text/plain\n\n{body}\n"
+    if kind == 'html':
+        paragraphs = ''.join(f'<p>{body[i:i + 120]}</p>' for i in range(0, len(body), 120))
+        return (f"{headers}Content-Type: text/html\n\n<html><body><table><tr><td>{paragraphs}"
+                f"<a href=\"http://example.com/{rng.randint(1, 999)}\">click</a></td></tr></table></body></html>\n")
+
+    # Con adjunto: la mayor parte del tamaño es un adjunto en base64
+    boundary = uuid.uuid4().hex
+    attachment = base64.encodebytes(os.urandom(rng.randint(20, 200) * 1024)).decode('ascii')
+    return (
+        f"{headers}MIME-Version: 1.0\nContent-Type: multipart/mixed; boundary=\"{boundary}\"\n\n"
+        f"--{boundary}\nContent-Type: text/plain\n\n{body}\n"
+        f"--{boundary}\nContent-Type: application/pdf\nContent-Transfer-Encoding: base64\n"
+        f"Content-Disposition: attachment; filename=\"doc.pdf\"\n\n{attachment}\n--{boundary}--\n"
+    )
+
+
+def load_corpus(args, rng):
+    """Lista de (nombre, bytes, tipo) con los emails a reproducir."""
+    if args.trec_index:
+        from spam_detector.utils.inmail import read_trec_index
+
+        entries = read_trec_index(args.trec_index)
+        rng.shuffle(entries)
+        corpus = []
+        for path, _ in entries[:args.corpus_size]:
+            try:
+                with open(path, 'rb') as f:
+                    corpus.append((os.path.basename(path), f.read(), 'trec'))
+            except OSError:
+                continue
+        if not corpus:
+            raise SystemExit(f'No se pudo leer ningún email del index {args.trec_index}')
+        return corpus
+
+    mix = parse_weights(args.mix, ('plain', 'html', 'attachment'))
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=args.corpus_size)
+    return [(f'{kind}-{i}.eml', synthetic_email(rng, kind).encode('utf-8'), kind) for i, kind in enumerate(kinds)]
+
+
+def build_request(endpoint, email, host, client_ip):
+    method, path = ENDPOINTS[endpoint]
+    name, raw, _ = email
+    headers = {'Host': host, 'Connection': 'close', 'X-Forwarded-For': client_ip,
+               'User-Agent': 'spam-detector-load-generator'}
+    body = b''
+
+    if endpoint == 'analyze':
+        body = json.dumps({'email_text': raw.decode('utf-8', errors='replace')}).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    elif endpoint == 'analyze-file':
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{name}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode('utf-8') + raw + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+
+    if method == 'POST':
+        headers['Content-Length'] = str(len(body))
+    head = f'{method} {path} HTTP/1.1\r\n' + ''.join(f'{k}: {v}\r\n' for k, v in headers.items()) + '\r\n'
+    return head.encode('latin-1') + body
+
+
+async def send(host, port, payload, timeout):
+    """Envía un request y retorna el código de estado HTTP."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(payload)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        # Connection: close -> leer hasta EOF
+        await asyncio.wait_for(reader.read(), timeout)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    host_header = url.netloc
+
+    corpus = load_corpus(args, rng)
+    # analyze recibe el email como JSON: sin adjuntos y dentro del límite del serializer,
+    # para no medir rechazos de validación (400) en lugar del servicio
+    text_corpus = [email for email in corpus if email[2] != 'attachment' and len(email[1]) <= ANALYZE_MAX_CHARS]
+    endpoint_weights = parse_weights(args.endpoints, tuple(ENDPOINTS))
+    if endpoint_weights.get('analyze') and not text_corpus:
+        raise SystemExit(f'Ningún email del corpus sirve para analyze (sin adjuntos y ≤ {ANALYZE_MAX_CHARS} caracteres)')
+    names, weights = list(endpoint_weights), list(endpoint_weights.values())
+
+    stats = {
+        name: {'latencies': [], 'ok': 0, 'shed': 0, 'errors': 0, 'sent': 0, 'codes': Counter()}
+        for name in names
+    }
+    in_flight = set()
+    skipped = 0
+
+    async def one(endpoint, scheduled, payload):
+        record = stats[endpoint]
+        try:
+            status = await send(host, port, payload, args.timeout)
+        except asyncio.TimeoutError:
+            record['errors'] += 1
+            record['codes']['timeout'] += 1
+            return
+        except (OSError, ValueError, IndexError):
+            record['errors'] += 1
+            record['codes']['conexión'] += 1
+            return
+        latency = (time.perf_counter() - scheduled) * 1000
+        if 200 <= status < 300:
+            record['ok'] += 1
+            record['latencies'].append(latency)
+        elif status in (429, 503):
+            record['shed'] += 1
+        else:
+            record['errors'] += 1
+            record['codes'][status] += 1
+
+    loop_start = time.perf_counter()
+    next_arrival = loop_start
+    while next_arrival - loop_start < args.duration:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        endpoint = rng.choices(names, weights=weights)[0]
+        if len(in_flight) >= args.max_in_flight:
+            # Límite del cliente (descriptores de archivo): se cuenta, no se reintenta
+            skipped += 1
+        else:
+            pool = text_corpus if endpoint == 'analyze' else corpus
+            payload = build_request(endpoint, rng.choice(pool), host_header, f'10.{rng.randint(0, 255)}.'
+                                    f'{rng.randint(0, 255)}.{rng.randint(1, args.clients)}')
+            stats[endpoint]['sent'] += 1
+            task = asyncio.ensure_future(one(endpoint, next_arrival, payload))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        next_arrival += rng.expovariate(args.rate) if args.arrivals == 'poisson' else 1.0 / args.rate
+
+    if in_flight:
+        await asyncio.wait(in_flight)
+    elapsed = time.perf_counter() - loop_start
+    return stats, skipped, elapsed, len(corpus)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--url', default='http://127.0.0.1:8000')
+    arg_parser.add_argument('--rate', type=float, default=10, help='Requests por segundo (lazo abierto)')
+    arg_parser.add_argument('--duration', type=float, default=30, help='Segundos de generación de carga')
+    arg_parser.add_argument('--arrivals', choices=['poisson', 'constant'], default='poisson')
+    arg_parser.add_argument('--endpoints', default='analyze=0.6,analyze-file=0.2,statistics=0.1,history=0.1')
+    arg_parser.add_argument('--trec-index', help='Index estilo TREC ("spam ../data/inmail.1" por línea)')
+    arg_parser.add_argument('--mix', default='plain=0.5,html=0.3,attachment=0.2', help='Mezcla sintética')
+    arg_parser.add_argument('--corpus-size', type=int, default=500)
+    arg_parser.add_argument('--clients', type=int, default=50,
+                            help='IPs de cliente distintas (X-Forwarded-For; el servidor debe incluir '
+                                 'la IP del generador en TRUSTED_PROXIES)')
+    arg_parser.add_argument('--max-in-flight', type=int, default=500)
+    arg_parser.add_argument('--timeout', type=float, default=30)
+    arg_parser.add_argument('--seed', type=int, default=42)
+    args = arg_parser.parse_args()
+
+    stats, skipped, elapsed, corpus_size = asyncio.run(run(args))
+
+    print("=" * 60)
+    print("GENERADOR DE CARGA (LAZO ABIERTO)")
+    print("=" * 60)
+    print(f"Destino: {args.url}  Tasa: {args.rate:.1f} req/s ({args.arrivals})  Duración: {elapsed:.1f} s")
+    print(f"Corpus: {corpus_size} emails ({'TREC' if args.trec_index else args.mix})")
+    if skipped:
+        print(f"⚠️ {skipped} llegadas omitidas por --max-in-flight")
+    print(f"{'Endpoint':<13} {'Env.':>6} {'OK/s':>7} {'429/503':>8} {'Error %':>8} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'máx ms':>8}")
+    for name, r in stats.items():
+        latencies = r['latencies']
+        error_rate = r['errors'] / r['sent'] * 100 if r['sent'] else 0.0
+        print(f"{name:<13} {r['sent']:>6} {r['ok'] / elapsed:>7.1f} {r['shed']:>8} {error_rate:>7.1f}% "
+              f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 90):>8.1f} "
+              f"{percentile(latencies, 99):>8.1f} {max(latencies, default=0.0):>8.1f}")
+
+    for name, r in stats.items():
+        if r['codes']:
+            detail = ', '.join(f'{code}: {count}' for code, count in r['codes'].most_common())
+            print(f"Errores {name}: {detail}")
+
+
+if __name__ == '__main__':
+    main()
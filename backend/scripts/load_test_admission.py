@@ -0,0 +1,166 @@
+"""
+Prueba de carga del control de admisión (spam_detector.middleware).
+
+Levanta el WSGI de Django en un servidor con hilos, dos veces (sin y con
+AdmissionControlMiddleware), y lo satura con clientes concurrentes que envían
+emails distintos a /api/analyze/ (sin aciertos en el índice de campañas).
+Compara throughput, rechazos 429 y percentiles de latencia de los requests atendidos.
+
+Uso:
+    python scripts/load_test_admission.py [--clients 32] [--seconds 10] [--max-concurrent 2]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+WORDS = (
+    'free offer money click winner prize account bank verify password urgent '
+    'limited time deal discount credit loan meeting project report schedule '
+    'team review budget invoice shipping order delivery customer support'
+).split()
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+
+    import django
+    django.setup()
+
+
+def start_server(admission):
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    # El middleware lee la configuración al crear el handler
+    settings.ADMISSION_CONTROL_ENABLED = admission
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+    server.request_queue_size = 256
+    server.set_app(WSGIHandler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def run_load(port, clients, seconds):
+    stop = threading.Event()
+    latencies = []
+    counts = {'ok': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def client(n):
+        rng = random.Random(n)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while not stop.is_set():
+            body = 'Subject: prueba\n\n' + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(50, 150)))
+            start = time.perf_counter()
+            try:
+                conn.request(
+                    'POST', '/api/analyze/', body=json.dumps({'email_text': body}),
+                    headers={'Content-Type': 'application/json', 'X-Forwarded-For': f'10.0.0.{n}'}
+                )
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    counts['errors'] += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.status == 200:
+                    counts['ok'] += 1
+                    latencies.append(elapsed * 1000)
+                elif response.status == 429:
+                    counts['rejected'] += 1
+                    # Un cliente que respeta Retry-After no reintenta de inmediato
+                    stop.wait(0.05)
+                else:
+                    counts['errors'] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'throughput': counts['ok'] / seconds,
+        'rejected': counts['rejected'],
+        'errors': counts['errors'],
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'max': max(latencies) if latencies else 0.0,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--clients', type=int, default=32)
+    arg_parser.add_argument('--seconds', type=float, default=10)
+    arg_parser.add_argument('--max-concurrent', type=int, default=2)
+    arg_parser.add_argument('--max-queue-delay-ms', type=int, default=200)
+    args = arg_parser.parse_args()
+
+    setup_django(os.path.join(tempfile.mkdtemp(prefix='admission-load-'), 'load.sqlite3'))
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from spam_detector.utils.model_loader import ensure_ready
+
+    call_command('migrate', verbosity=0)
+    ensure_ready()
+    settings.ADMISSION_MAX_CONCURRENT = args.max_concurrent
+    settings.ADMISSION_MAX_QUEUE_DELAY_MS = args.max_queue_delay_ms
+    # Clientes distintos: el límite que actúa es el global, no el de cada IP
+    settings.ADMISSION_RATE_PER_CLIENT = 1000
+    # Los clientes simulados se distinguen por X-Forwarded-For, enviado desde 127.0.0.1
+    settings.TRUSTED_PROXIES = ['127.0.0.1']
+
+    results = {}
+    for admission in (False, True):
+        server = start_server(admission)
+        results[admission] = run_load(server.server_address[1], args.clients, args.seconds)
+        server.shutdown()
+        server.server_close()
+
+    print("=" * 60)
+    print("PRUEBA DE CARGA: CONTROL DE ADMISIÓN")
+    print("=" * 60)
+    print(f"Clientes concurrentes: {args.clients}  Duración: {args.seconds:.0f} s  "
+          f"Cupos: {args.max_concurrent}  Cola máx.: {args.max_queue_delay_ms} ms")
+    print(f"{'Admisión':<10} {'OK/s':>7} {'429':>7} {'Errores':>8} {'p50 ms':>9} {'p99 ms':>9} {'máx ms':>9}")
+    for admission, r in results.items():
+        print(f"{'sí' if admission else 'no':<10} {r['throughput']:>7.1f} {r['rejected']:>7} {r['errors']:>8} "
+              f"{r['p50']:>9.1f} {r['p99']:>9.1f} {r['max']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
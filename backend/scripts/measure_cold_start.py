@@ -0,0 +1,111 @@
+"""
+Mide el arranque en frío de los procesos del backend.
+
+- Comando de administración (showmigrations): tiempo total y si se importó scikit-learn.
+- Proceso WSGI con precarga (ML_MODEL_PRELOAD=1): tiempo hasta estar listo y latencia
+  del primer /api/analyze/.
+- Proceso WSGI sin precarga (ML_MODEL_PRELOAD=0): el primer request paga la carga.
+
+Cada medición corre en un proceso nuevo; se reporta el mínimo de --runs ejecuciones.
+
+Uso:
+    python scripts/measure_cold_start.py [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMAND_PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+from django.conf import settings
+settings.DATABASES['default']['NAME'] = os.environ['PROBE_DB']
+from django.core.management import call_command
+import io
+import django
+django.setup()
+call_command('showmigrations', 'spam_detector', stdout=io.StringIO())
+print(json.dumps({'seconds': time.perf_counter() - start, 'sklearn': 'sklearn' in sys.modules}))
+"""
+
+MIGRATE_PROBE = """
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+from django.conf import settings
+settings.DATABASES['default']['NAME'] = os.environ['PROBE_DB']
+import django
+django.setup()
+from django.core.management import call_command
+call_command('migrate', verbosity=0)
+print('{}')
+"""
+
+WSGI_PROBE = """
+import io, json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+from django.conf import settings
+settings.DATABASES['default']['NAME'] = os.environ['PROBE_DB']
+from django_spam_detector.wsgi import application
+ready = time.perf_counter() - start
+
+body = json.dumps({'email_text': 'Subject: Hola\\n\\nClick here to claim your free prize money now'}).encode()
+environ = {
+    'REQUEST_METHOD': 'POST', 'PATH_INFO': '/api/analyze/', 'SERVER_NAME': 'localhost',
+    'SERVER_PORT': '80', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(body),
+    'CONTENT_TYPE': 'application/json', 'CONTENT_LENGTH': str(len(body)), 'REMOTE_ADDR': '127.0.0.1',
+}
+first = time.perf_counter()
+statuses = []
+b''.join(application(environ, lambda status, headers: statuses.append(status)))
+print(json.dumps({'ready': ready, 'first_request': time.perf_counter() - first, 'status': statuses[0]}))
+"""
+
+
+def run_probe(code, env_overrides, runs):
+    env = dict(os.environ, **env_overrides)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=BASE_DIR, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--runs', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    # Base temporal para no escribir en db.sqlite3 desde el request de prueba
+    env = {'PYTHONPATH': BASE_DIR, 'PROBE_DB': os.path.join(tempfile.mkdtemp(prefix='cold-start-'), 'db.sqlite3')}
+    run_probe(MIGRATE_PROBE, env, 1)
+
+    command = run_probe(COMMAND_PROBE, env, args.runs)
+    preload = run_probe(WSGI_PROBE, dict(env, ML_MODEL_PRELOAD='1'), args.runs)
+    lazy = run_probe(WSGI_PROBE, dict(env, ML_MODEL_PRELOAD='0'), args.runs)
+
+    print("=" * 60)
+    print("ARRANQUE EN FRÍO")
+    print("=" * 60)
+    print(f"Comando showmigrations:            {min(r['seconds'] for r in command):.3f} s "
+          f"(scikit-learn importado: {'sí' if any(r['sklearn'] for r in command) else 'no'})")
+    print(f"WSGI con precarga, hasta listo:    {min(r['ready'] for r in preload):.3f} s")
+    print(f"  primer /api/analyze/:            {min(r['first_request'] for r in preload) * 1000:.1f} ms "
+          f"({preload[0]['status']})")
+    print(f"WSGI sin precarga, hasta importar: {min(r['ready'] for r in lazy):.3f} s")
+    print(f"  primer /api/analyze/:            {min(r['first_request'] for r in lazy) * 1000:.1f} ms "
+          f"({lazy[0]['status']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Reporte del ahorro de almacenamiento al deduplicar y comprimir email_content.
+
+Crea una base de datos SQLite temporal con el esquema anterior (0002), la llena
+con un conjunto sintético con muchos duplicados, aplica la migración de
+contenido (0003-0005) y compara el tamaño del archivo antes y después.
+
+Uso:
+    python scripts/report_content_storage.py [--rows 50000] [--campaigns 300]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+WORDS = (
+    'free offer money click winner prize account bank verify password urgent '
+    'limited time deal discount credit loan meeting project report schedule '
+    'team review budget invoice shipping order delivery customer support '
+    'update security notice subscription newsletter unsubscribe please thanks'
+).split()
+
+
+def random_body(rng, min_len=600, max_len=1000):
+    words = []
+    length = 0
+    target = rng.randint(min_len, max_len)
+    while length < target:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:1000]
+
+
+def build_dataset(rng, rows, campaigns):
+    """
+    60% copias exactas de campañas, 20% variantes de campaña (nombre distinto),
+    20% correos únicos.
+    """
+    templates = [random_body(rng) for _ in range(campaigns)]
+    for i in range(rows):
+        roll = rng.random()
+        if roll < 0.6:
+            yield rng.choice(templates)
+        elif roll < 0.8:
+            yield f"Hola usuario{rng.randint(1, 10 ** 6)}, {rng.choice(templates)}"[:1000]
+        else:
+            yield random_body(rng)
+
+
+def vacuum_size(connection, path):
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM')
+    return os.path.getsize(path)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--rows', type=int, default=50000)
+    arg_parser.add_argument('--campaigns', type=int, default=300)
+    args = arg_parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='content-report-'), 'report.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_spam_detector.settings')
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command('migrate', 'spam_detector', '0002', verbosity=0)
+
+    rng = random.Random(42)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO email_analysis (email_content, prediction, confidence, latency_ms, created_at, user_agent) "
+            "VALUES (%s, 'spam', 0.9, 5.0, '2026-01-01 00:00:00', '')",
+            [(text,) for text in build_dataset(rng, args.rows, args.campaigns)]
+        )
+        cursor.execute("SELECT COALESCE(SUM(LENGTH(email_content)), 0) FROM email_analysis")
+        raw_chars = cursor.fetchone()[0]
+    size_before = vacuum_size(connection, db_path)
+
+    start = time.perf_counter()
+    call_command('migrate', 'spam_detector', verbosity=0)
+    migration_seconds = time.perf_counter() - start
+    size_after = vacuum_size(connection, db_path)
+
+    from spam_detector.models import EmailContent
+    from django.db.models import Sum
+
+    stats = EmailContent.objects.aggregate(total=Sum('size'))
+    unique_contents = EmailContent.objects.count()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM email_content")
+        compressed_bytes = cursor.fetchone()[0]
+
+    print("=" * 60)
+    print("AHORRO DE ALMACENAMIENTO DE email_content")
+    print("=" * 60)
+    print(f"Análisis:                    {args.rows}")
+    print(f"Contenidos únicos:           {unique_contents} ({unique_contents / args.rows:.1%})")
+    print(f"Texto sin deduplicar:        {raw_chars / 1024 / 1024:.2f} MiB")
+    print(f"Texto único sin comprimir:   {(stats['total'] or 0) / 1024 / 1024:.2f} MiB")
+    print(f"Texto único comprimido:      {compressed_bytes / 1024 / 1024:.2f} MiB")
+    print(f"Base de datos antes:         {size_before / 1024 / 1024:.2f} MiB")
+    print(f"Base de datos después:       {size_after / 1024 / 1024:.2f} MiB")
+    print(f"Reducción:                   {1 - size_after / size_before:.1%}")
+    print(f"Tiempo de migración:         {migration_seconds:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
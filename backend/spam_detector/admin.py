@@ -1,14 +1,94 @@
+import ipaddress
+from datetime import date, datetime, time, timedelta
+
 from django.contrib import admin
-from .models import EmailAnalysis
+from django.db.models.expressions import RawSQL
+from .models import EmailAnalysis, ClassificationJob, DailyPredictionCount
+from .utils import search
+from .utils.pagination import ApproximateCountPaginator
+
+CHANGELIST_FIELDS = ('id', 'prediction', 'confidence', 'latency_ms', 'created_at', 'ip_address')
+
+
+def _midnight(value):
+    """Fecha de un límite 'AAAA-MM-DD 00:00:00...'; False si no cae a medianoche."""
+    if not value:
+        return None
+    moment = datetime.fromisoformat(value)
+    if moment.time() != time.min:
+        return False
+    return moment.date()
+
+
+def _count_filters(params):
+    """
+    Traduce los parámetros del changelist a (predicción, día inicial, día final).
+    Retorna None si hay filtros que los conteos diarios no pueden responder.
+    """
+    prediction = params.get('prediction') or None
+    year = params.get('created_at__year')
+    month = params.get('created_at__month')
+    day = params.get('created_at__day')
+    allowed = {'prediction', 'created_at__year', 'created_at__month', 'created_at__day',
+               'created_at__gte', 'created_at__lt', 'o', 'p'}
+    if set(params) - allowed:
+        return None
+    
+    try:
+        if day and month and year:
+            start = date(int(year), int(month), int(day))
+            end = start + timedelta(days=1)
+        elif month and year:
+            start = date(int(year), int(month), 1)
+            end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        elif year:
+            start = date(int(year), 1, 1)
+            end = date(int(year) + 1, 1, 1)
+        else:
+            # Filtro "Fecha" de list_filter: límites a medianoche
+            start, end = (_midnight(params.get(name)) for name in ('created_at__gte', 'created_at__lt'))
+            if start is False or end is False:
+                return None
+    except ValueError:
+        return None
+    return prediction, start, end
+
+
+class PredictionCountFilter(admin.SimpleListFilter):
+    """Filtro por predicción que muestra los conteos precalculados."""
+    
+    title = 'predicción'
+    parameter_name = 'prediction'
+    
+    def lookups(self, request, model_admin):
+        filters = _count_filters({k: v for k, v in request.GET.items() if k != self.parameter_name})
+        options = []
+        for value, label in EmailAnalysis.PREDICTION_CHOICES:
+            if filters is None:
+                options.append((value, label))
+            else:
+                _, start, end = filters
+                options.append((value, f"{label} ({DailyPredictionCount.total(value, start, end)})"))
+        return options
+    
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(prediction=self.value())
+        return queryset
 
 
 @admin.register(EmailAnalysis)
 class EmailAnalysisAdmin(admin.ModelAdmin):
     list_display = ('id', 'prediction', 'confidence_percentage', 'latency_ms', 'created_at', 'ip_address')
-    list_filter = ('prediction', 'created_at')
-    search_fields = ('email_content', 'ip_address')
-    readonly_fields = ('created_at',)
+    list_filter = (PredictionCountFilter, 'created_at')
+    search_fields = ('ip_address',)
+    search_help_text = 'Busca en el contenido (índice de texto completo) o por IP exacta.'
+    readonly_fields = ('created_at', 'email_content')
     ordering = ('-created_at',)
+    # Sin date_hierarchy: sus enlaces salen de un SELECT DISTINCT sobre toda la tabla
+    paginator = ApproximateCountPaginator
+    # Evita el COUNT(*) sin filtros que el admin hace junto al filtrado
+    show_full_result_count = False
     
     fieldsets = (
         ('Predicción', {
@@ -21,3 +101,54 @@ class EmailAnalysisAdmin(admin.ModelAdmin):
             'fields': ('ip_address', 'user_agent', 'created_at')
         }),
     )
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = getattr(request, 'resolver_match', None)
+        if match and match.url_name == 'spam_detector_emailanalysis_changelist':
+            # El listado no necesita el contenido ni el user agent
+            queryset = queryset.only(*CHANGELIST_FIELDS)
+        return queryset
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        count_hint = None
+        filters = _count_filters(request.GET)
+        if filters is not None:
+            count_hint = DailyPredictionCount.total(*filters)
+        return self.paginator(queryset, per_page, orphans, allow_empty_first_page, count_hint=count_hint)
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Busca en el contenido con el índice de texto completo en lugar de LIKE '%...%'.
+        """
+        search_term = search_term.strip()
+        if not search.is_supported() or not search.to_fts_query(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        
+        sql, params = search.matching_content_ids_sql(search_term)
+        by_content = queryset.filter(content_id__in=RawSQL(sql, params))
+        by_ip = queryset.filter(ip_address=search_term) if self._is_ip(search_term) else queryset.none()
+        return by_content | by_ip, False
+    
+    @staticmethod
+    def _is_ip(value):
+        try:
+            ipaddress.ip_address(value)
+            return True
+        except ValueError:
+            return False
+
+
+@admin.register(DailyPredictionCount)
+class DailyPredictionCountAdmin(admin.ModelAdmin):
+    list_display = ('day', 'prediction', 'count')
+    list_filter = ('prediction',)
+    date_hierarchy = 'day'
+
+
+@admin.register(ClassificationJob)
+class ClassificationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'source', 'processed_items', 'total_items', 'failed_items', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+    ordering = ('-created_at',)
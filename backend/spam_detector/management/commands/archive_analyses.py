@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from spam_detector.utils.archive import archive_dir, archive_older_than, default_format
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve los análisis más antiguos que la retención configurada a archivos '
+        'comprimidos por día y los elimina de la tabla email_analysis en lotes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'ANALYSIS_RETENTION_DAYS', 30),
+            help='Días que se conservan en la tabla (por defecto ANALYSIS_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'ANALYSIS_ARCHIVE_BATCH_SIZE', 1000),
+            help='Filas por lote al exportar y al borrar'
+        )
+        parser.add_argument('--format', choices=['parquet', 'ndjson'], help='Por defecto parquet si pyarrow está instalado')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days debe ser al menos 1')
+
+        fmt = options['format'] or default_format()
+        self.stdout.write(f"Archivando análisis de hace más de {options['days']} días en {archive_dir()} ({fmt})")
+
+        try:
+            summary = archive_older_than(
+                options['days'],
+                batch_size=max(1, options['batch_size']),
+                fmt=fmt,
+                log=self.stdout.write
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {summary['archived']} filas archivadas de {summary['days']} días "
+            f"({summary['deleted']} eliminadas de la tabla, {summary['contents_deleted']} contenidos huérfanos)"
+        ))
@@ -0,0 +1,183 @@
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from spam_detector.utils.inmail import decode_inmail, list_directory, read_trec_index
+
+OUTPUT_FIELDS = ['path', 'label', 'prediction', 'confidence', 'spam_keywords', 'error']
+
+
+def _init_worker():
+    """
+    Inicializa cada proceso del pool: configura Django y carga el modelo una sola vez.
+    Con 'fork' el modelo ya viene heredado del proceso padre.
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    from spam_detector.utils.model_loader import get_model
+
+    if get_model() is None:
+        raise RuntimeError('Modelo no cargado en el worker')
+
+
+def _classify_batch(batch):
+    """Clasifica un lote de (ruta, etiqueta) y retorna las filas de salida."""
+    from spam_detector.utils.ml_handler import predict_spam_batch
+
+    rows = []
+    texts = []
+    pending = []
+    for path, label in batch:
+        row = {'path': path, 'label': label or '', 'prediction': 'error',
+               'confidence': 0.0, 'spam_keywords': '', 'error': ''}
+        try:
+            with open(path, 'rb') as f:
+                text = decode_inmail(f.read())
+            if text is None:
+                row['error'] = 'No se pudo decodificar el archivo'
+            else:
+                texts.append(text)
+                pending.append(row)
+        except OSError as e:
+            row['error'] = str(e)
+        rows.append(row)
+
+    for row, result in zip(pending, predict_spam_batch(texts)):
+        row['prediction'] = result['prediction']
+        row['confidence'] = result['confidence']
+        row['spam_keywords'] = ' '.join(result.get('spam_keywords', []))
+        row['error'] = result.get('error', '')
+
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Clasifica offline un directorio o un archivo index estilo TREC usando un pool '
+        'de procesos, y escribe los resultados en CSV o NDJSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Directorio con emails o archivo index TREC ("spam ../data/inmail.1")')
+        parser.add_argument('--output', '-o', required=True, help='Archivo de salida')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Formato de salida (por defecto según extensión)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=64)
+        parser.add_argument('--limit', type=int, help='Procesar como máximo N emails')
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continuar desde el checkpoint (<output>.checkpoint) de una ejecución anterior'
+        )
+
+    def handle(self, *args, **options):
+        source = options['source']
+        output_path = options['output']
+        output_format = options['format'] or ('ndjson' if output_path.endswith(('.ndjson', '.jsonl')) else 'csv')
+        checkpoint_path = f"{output_path}.checkpoint"
+
+        # Cargar el modelo antes de crear el pool: con 'fork' los workers lo heredan
+        from spam_detector.utils.model_loader import load_model, status
+
+        if load_model() is None:
+            raise CommandError(f"Modelo no disponible: {status()['error']}")
+
+        if os.path.isdir(source):
+            entries = list_directory(source)
+        elif os.path.isfile(source):
+            entries = read_trec_index(source)
+        else:
+            raise CommandError(f'No existe: {source}')
+
+        if options['limit']:
+            entries = entries[:options['limit']]
+
+        done = set()
+        if options['resume'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, 'r') as f:
+                done = {line.rstrip('\n') for line in f}
+            entries = [entry for entry in entries if entry[0] not in done]
+            self.stderr.write(f"Reanudando: {len(done)} emails ya procesados")
+        elif not options['resume']:
+            for path in (output_path, checkpoint_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        batch_size = max(1, options['batch_size'])
+        batches = [entries[i:i + batch_size] for i in range(0, len(entries), batch_size)]
+        total = len(entries)
+
+        write_header = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        processed = 0
+        start = time.time()
+
+        with open(output_path, 'a', newline='', encoding='utf-8') as out, \
+                open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+            writer = None
+            if output_format == 'csv':
+                writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS)
+                if write_header:
+                    writer.writeheader()
+
+            with multiprocessing.Pool(processes=max(1, options['workers']), initializer=_init_worker) as pool:
+                for rows in pool.imap_unordered(_classify_batch, batches):
+                    for row in rows:
+                        if writer is not None:
+                            writer.writerow(row)
+                        else:
+                            out.write(json.dumps(row, ensure_ascii=False) + '\n')
+                    out.flush()
+
+                    # El checkpoint se escribe después de los resultados del lote
+                    checkpoint.write(''.join(f"{row['path']}\n" for row in rows))
+                    checkpoint.flush()
+
+                    processed += len(rows)
+                    elapsed = time.time() - start
+                    rate = processed / elapsed if elapsed > 0 else 0
+                    self.stderr.write(f"\rProcesados {processed}/{total} ({rate:.1f} emails/s)", ending='')
+
+        self.stderr.write('')
+        self.stdout.write(self.style.SUCCESS(f"✅ {processed} emails clasificados → {output_path}"))
+
+        self._report_accuracy(output_path, output_format)
+
+    def _report_accuracy(self, output_path, output_format):
+        """Calcula métricas sobre todo el archivo de salida si hay etiquetas."""
+        with open(output_path, 'r', encoding='utf-8') as f:
+            if output_format == 'csv':
+                rows = list(csv.DictReader(f))
+            else:
+                rows = [json.loads(line) for line in f if line.strip()]
+
+        labeled = [r for r in rows if r['label'] in ('spam', 'ham') and r['prediction'] in ('spam', 'ham')]
+        if not labeled:
+            return
+
+        tp = sum(1 for r in labeled if r['label'] == 'spam' and r['prediction'] == 'spam')
+        tn = sum(1 for r in labeled if r['label'] == 'ham' and r['prediction'] == 'ham')
+        fp = sum(1 for r in labeled if r['label'] == 'ham' and r['prediction'] == 'spam')
+        fn = sum(1 for r in labeled if r['label'] == 'spam' and r['prediction'] == 'ham')
+
+        accuracy = (tp + tn) / len(labeled)
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+        self.stdout.write("\nREPORTE DE PRECISIÓN")
+        self.stdout.write("-" * 40)
+        self.stdout.write(f"Emails etiquetados: {len(labeled)} (errores: {len(rows) - len(labeled)})")
+        self.stdout.write(f"Accuracy:  {accuracy:.4f}")
+        self.stdout.write(f"Precision: {precision:.4f}")
+        self.stdout.write(f"Recall:    {recall:.4f}")
+        self.stdout.write(f"F1:        {f1:.4f}")
+        self.stdout.write(f"Matriz de confusión: TP={tp} FP={fp} TN={tn} FN={fn}")
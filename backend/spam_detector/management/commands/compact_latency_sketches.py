@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from spam_detector.utils.sketches import compact
+
+
+class Command(BaseCommand):
+    help = (
+        'Combina los sketches de latencia y confianza de todos los workers en una fila '
+        'por ventana, para las ventanas ya cerradas (acelera /api/statistics/).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-minutes',
+            type=int,
+            default=60,
+            help='Solo ventanas que empezaron hace más de estos minutos (ya guardadas por todos los workers)'
+        )
+
+    def handle(self, *args, **options):
+        if options['older_than_minutes'] < 1:
+            raise CommandError('--older-than-minutes debe ser al menos 1')
+
+        before = timezone.now() - timedelta(minutes=options['older_than_minutes'])
+        removed = compact(before)
+        self.stdout.write(self.style.SUCCESS(f"✅ Sketches compactados ({removed} filas eliminadas)"))
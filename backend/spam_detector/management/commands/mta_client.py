@@ -0,0 +1,36 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from spam_detector.utils.mta_protocol import FilterClient
+
+
+class Command(BaseCommand):
+    help = 'Cliente de prueba para el servidor de filtrado: clasifica archivos inmail en pipeline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*', help='Archivos a clasificar (por defecto lee stdin)')
+        parser.add_argument('--unix', help='Ruta del socket Unix del servidor')
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=10025)
+
+    def handle(self, *args, **options):
+        if options['files']:
+            messages = []
+            for path in options['files']:
+                with open(path, 'rb') as f:
+                    messages.append(f.read())
+            names = options['files']
+        else:
+            messages = [sys.stdin.buffer.read()]
+            names = ['<stdin>']
+
+        try:
+            with FilterClient(host=options['host'], port=options['port'], unix_path=options['unix']) as client:
+                results = client.classify_many(messages)
+        except OSError as e:
+            raise CommandError(f'No se pudo conectar con el servidor: {e}')
+
+        for name, result in zip(names, results):
+            self.stdout.write(json.dumps({'file': name, **result}, ensure_ascii=False))
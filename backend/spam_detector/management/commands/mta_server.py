@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from spam_detector.utils.mta_protocol import TCPFilterServer, UnixFilterServer, DEFAULT_MAX_FRAME_BYTES
+
+
+class Command(BaseCommand):
+    help = (
+        'Inicia el servidor de filtrado para el MTA (conexiones persistentes con '
+        'tramas con prefijo de longitud) reutilizando el motor de ml_handler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--unix', help='Ruta del socket Unix donde escuchar')
+        parser.add_argument('--host', default='127.0.0.1', help='Host TCP (por defecto 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=10025, help='Puerto TCP (por defecto 10025)')
+        parser.add_argument('--max-frame-bytes', type=int, default=DEFAULT_MAX_FRAME_BYTES)
+        parser.add_argument(
+            '--no-record',
+            action='store_true',
+            help='No guardar los análisis en el historial (EmailAnalysis)'
+        )
+
+    def handle(self, *args, **options):
+        from spam_detector.utils.model_loader import ensure_ready, status
+
+        if not ensure_ready():
+            raise CommandError(f"Modelo no disponible: {status()['error']}")
+
+        record = not options['no_record']
+        if options['unix']:
+            server = UnixFilterServer(options['unix'], record=record, max_frame_bytes=options['max_frame_bytes'])
+            where = options['unix']
+        else:
+            server = TCPFilterServer(
+                (options['host'], options['port']),
+                record=record,
+                max_frame_bytes=options['max_frame_bytes']
+            )
+            where = f"{options['host']}:{options['port']}"
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Servidor de filtrado escuchando en {where}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Deteniendo servidor...')
+        finally:
+            server.server_close()
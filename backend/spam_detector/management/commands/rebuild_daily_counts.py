@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from spam_detector.models import DailyPredictionCount
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los conteos diarios por predicción desde email_analysis.'
+
+    def handle(self, *args, **options):
+        DailyPredictionCount.rebuild()
+        total = DailyPredictionCount.total()
+        self.stdout.write(self.style.SUCCESS(f"✅ Conteos recalculados ({total} análisis)"))
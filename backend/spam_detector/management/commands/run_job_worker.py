@@ -0,0 +1,55 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from spam_detector.utils.jobs import claim_chunk, cleanup_expired_jobs, process_chunk, release_stale_chunks
+from spam_detector.utils.model_loader import ensure_ready, status as model_status
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker local de trabajos asíncronos: reclama fragmentos de la cola en la base de '
+        'datos, los clasifica y limpia los resultados expirados. Se pueden lanzar varios.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Segundos de espera con la cola vacía')
+        parser.add_argument('--cleanup-interval', type=float, default=300.0, help='Segundos entre limpiezas')
+        parser.add_argument('--once', action='store_true', help='Procesar hasta vaciar la cola y salir')
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        if not ensure_ready():
+            raise CommandError(f"Modelo no disponible: {model_status()['error']}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Worker de trabajos iniciado ({worker_id})"))
+
+        last_cleanup = 0.0
+        try:
+            while True:
+                close_old_connections()
+
+                if time.time() - last_cleanup >= options['cleanup_interval']:
+                    deleted = cleanup_expired_jobs()
+                    released = release_stale_chunks()
+                    if deleted or released:
+                        self.stdout.write(f"Limpieza: {deleted} registros expirados, {released} fragmentos liberados")
+                    last_cleanup = time.time()
+
+                chunk = claim_chunk(worker_id)
+                if chunk is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                started = time.time()
+                process_chunk(chunk)
+                self.stdout.write(
+                    f"Trabajo {chunk.job_id} fragmento #{chunk.index} procesado "
+                    f"en {(time.time() - started) * 1000:.0f} ms"
+                )
+        except KeyboardInterrupt:
+            self.stdout.write('Deteniendo worker...')
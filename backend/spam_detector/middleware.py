@@ -0,0 +1,204 @@
+"""
+Control de admisión para los endpoints de inferencia (/api/analyze/, /api/analyze-file/,
+/api/explain/).
+
+Antes de llegar a la vista, cada request pasa tres filtros; si alguno lo rechaza
+se responde 429 con Retry-After en lugar de encolarlo:
+
+1. Token bucket por IP de cliente (ADMISSION_RATE_PER_CLIENT, ADMISSION_BURST). La IP
+   es REMOTE_ADDR; X-Forwarded-For solo se usa si REMOTE_ADDR es uno de
+   TRUSTED_PROXIES, y entonces su dirección más a la derecha que no sea
+   un proxy de confianza (el cliente no puede elegir su clave).
+2. Límite global de inferencias concurrentes en el proceso (ADMISSION_MAX_CONCURRENT).
+3. Descarte por latencia: si el request ya esperó más de ADMISSION_MAX_QUEUE_DELAY_MS,
+   sea en la cola del proxy (cabecera X-Request-Start) o esperando un cupo de inferencia.
+
+El estado es por proceso; con ADMISSION_SHARED_STATE los límites por cliente se
+llevan en el cache de Django (contador por ventana, compartido entre workers).
+
+ProfilingMiddleware perfila una muestra de requests (ver utils.profiling).
+"""
+
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+
+from .utils.network import get_client_ip
+from .utils import profiling
+
+
+class TokenBucket:
+    """Token buckets por clave, en memoria y con tamaño acotado (LRU)."""
+
+    def __init__(self, rate, burst, max_entries=10000):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, now=None):
+        """
+        Consume un token de `key`.
+
+        Returns:
+            float: 0 si se admitió, o segundos hasta que haya un token disponible
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate if self.rate > 0 else 60.0
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class SharedWindowLimiter:
+    """
+    Límite por clave compartido entre procesos a través del cache de Django.
+    Usa un contador por ventana fija (cache.add + cache.incr son atómicos en
+    Redis/Memcached), que aproxima el token bucket: rate * ventana + burst.
+    """
+
+    def __init__(self, rate, burst, window=10):
+        self.window = window
+        self.limit = int(rate * window + burst)
+
+    def take(self, key, now=None):
+        now = time.time() if now is None else now
+        window_id = int(now // self.window)
+        cache_key = f'admission:{key}:{window_id}'
+        cache.add(cache_key, 0, timeout=self.window * 2)
+        try:
+            count = cache.incr(cache_key)
+        except ValueError:
+            # La clave expiró entre add e incr
+            cache.set(cache_key, 1, timeout=self.window * 2)
+            count = 1
+        if count <= self.limit:
+            return 0.0
+        return (window_id + 1) * self.window - now
+
+
+def request_queue_delay(request, now=None):
+    """
+    Segundos que el request esperó antes de llegar a Django, según la cabecera
+    X-Request-Start del proxy ('t=<epoch>' en segundos, ms o µs). None si no hay.
+    """
+    header = request.META.get('HTTP_X_REQUEST_START', '')
+    value = header[2:] if header.startswith('t=') else header
+    try:
+        started = float(value)
+    except ValueError:
+        return None
+
+    # Normalizar µs / ms a segundos
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    now = time.time() if now is None else now
+    return max(0.0, now - started)
+
+
+class AdmissionControlMiddleware:
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'ADMISSION_CONTROL_ENABLED', False):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, 'ADMISSION_PATHS', ('/api/analyze/', '/api/analyze-file/', '/api/explain/')))
+        self.max_queue_delay = getattr(settings, 'ADMISSION_MAX_QUEUE_DELAY_MS', 500) / 1000
+
+        rate = getattr(settings, 'ADMISSION_RATE_PER_CLIENT', 5.0)
+        burst = getattr(settings, 'ADMISSION_BURST', 20)
+        if getattr(settings, 'ADMISSION_SHARED_STATE', False):
+            self.limiter = SharedWindowLimiter(rate, burst)
+        else:
+            self.limiter = TokenBucket(rate, burst)
+
+        max_concurrent = getattr(settings, 'ADMISSION_MAX_CONCURRENT', 4)
+        self.slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+        # Promedio móvil del tiempo de servicio, para sugerir Retry-After
+        self._avg_service = 0.05
+        self._stats_lock = threading.Lock()
+
+    def __call__(self, request):
+        if request.method != 'POST' or not request.path.startswith(self.paths):
+            return self.get_response(request)
+
+        delay = request_queue_delay(request)
+        if delay is not None and delay > self.max_queue_delay:
+            return self._reject('Servidor saturado, intenta de nuevo más tarde.', self._avg_service)
+
+        wait = self.limiter.take(get_client_ip(request) or 'unknown')
+        if wait > 0:
+            return self._reject('Demasiadas solicitudes para este cliente.', wait)
+
+        if self.slots is None:
+            return self._serve(request)
+
+        # Esperar cupo solo hasta agotar el presupuesto de cola restante
+        budget = max(0.0, self.max_queue_delay - (delay or 0.0))
+        if not self.slots.acquire(timeout=budget):
+            return self._reject('Servidor saturado, intenta de nuevo más tarde.', self._avg_service)
+        try:
+            return self._serve(request)
+        finally:
+            self.slots.release()
+
+    def _serve(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._avg_service = 0.9 * self._avg_service + 0.1 * elapsed
+        return response
+
+    def _reject(self, message, retry_after):
+        response = JsonResponse({'error': message}, status=429)
+        response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Perfila una fracción (PROFILING_SAMPLE_RATE) de los requests a PROFILING_PATHS.
+    Deshabilitado (PROFILING_ENABLED=0) se retira de la cadena con MiddlewareNotUsed.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.01)
+        self.paths = tuple(getattr(settings, 'PROFILING_PATHS', ('/api/',)))
+
+        if profiling.get_profiler() is None:
+            profiling.set_profiler(profiling.Profiler(
+                interval=getattr(settings, 'PROFILING_INTERVAL_MS', 5) / 1000,
+                track_allocations=getattr(settings, 'PROFILING_TRACEMALLOC', False),
+                allocation_frames=getattr(settings, 'PROFILING_TRACEMALLOC_FRAMES', 15),
+            ))
+        self.profiler = profiling.get_profiler()
+
+    def __call__(self, request):
+        if request.path.startswith(self.paths) and random.random() < self.sample_rate:
+            return self.profiler.profile(self.get_response, request)
+        return self.get_response(request)
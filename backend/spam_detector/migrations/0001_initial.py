@@ -0,0 +1,31 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email_content', models.TextField(help_text='Contenido del email analizado')),
+                ('prediction', models.CharField(choices=[('spam', 'SPAM'), ('ham', 'HAM')], max_length=10)),
+                ('confidence', models.FloatField(help_text='Nivel de confianza (0-1)')),
+                ('latency_ms', models.FloatField(help_text='Tiempo de respuesta en milisegundos')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('user_agent', models.CharField(blank=True, max_length=500)),
+            ],
+            options={
+                'db_table': 'email_analysis',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='email_analy_created_58b3b3_idx'), models.Index(fields=['prediction'], name='email_analy_predict_247627_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spam_detector', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassificationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En proceso'), ('completed', 'Completado'), ('failed', 'Fallido')], db_index=True, default='pending', max_length=10)),
+                ('source', models.CharField(blank=True, help_text="Nombre del archivo o 'batch'", max_length=255)),
+                ('total_items', models.PositiveIntegerField(default=0)),
+                ('processed_items', models.PositiveIntegerField(default=0)),
+                ('failed_items', models.PositiveIntegerField(default=0)),
+                ('chunk_size', models.PositiveIntegerField(default=100)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                'db_table': 'classification_job',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField(help_text='Posición del fragmento dentro del trabajo')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En proceso'), ('done', 'Terminado'), ('failed', 'Fallido')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('payload', models.TextField(help_text='Emails del fragmento en JSON (se vacía al terminar)')),
+                ('results', models.TextField(blank=True, help_text='Resultados del fragmento en JSON')),
+                ('error', models.TextField(blank=True)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='spam_detector.classificationjob')),
+            ],
+            options={
+                'db_table': 'classification_job_chunk',
+                'ordering': ['job', 'index'],
+                'indexes': [models.Index(fields=['status', 'locked_at'], name='classificat_status_b6d77e_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='jobchunk',
+            constraint=models.UniqueConstraint(fields=('job', 'index'), name='unique_job_chunk_index'),
+        ),
+    ]
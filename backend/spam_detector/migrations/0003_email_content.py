@@ -0,0 +1,31 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spam_detector', '0002_classification_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(help_text='SHA-256 del texto sin comprimir', max_length=64, unique=True)),
+                ('data', models.BinaryField(help_text='Texto comprimido con zlib')),
+                ('size', models.PositiveIntegerField(help_text='Longitud del texto sin comprimir (caracteres)')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'email_content',
+            },
+        ),
+        migrations.AddField(
+            model_name='emailanalysis',
+            name='content',
+            field=models.ForeignKey(blank=True, help_text='Contenido del email analizado (primeros 1000 caracteres, deduplicado)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='analyses', to='spam_detector.emailcontent'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+import hashlib
+import zlib
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def forwards(apps, schema_editor):
+    """Mueve email_content a la tabla email_content, guardando cada texto una sola vez."""
+    EmailAnalysis = apps.get_model('spam_detector', 'EmailAnalysis')
+    EmailContent = apps.get_model('spam_detector', 'EmailContent')
+
+    last_id = 0
+    while True:
+        batch = list(
+            EmailAnalysis.objects.filter(id__gt=last_id)
+            .order_by('id').values_list('id', 'email_content')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+
+        # Agrupar los análisis del lote por hash de contenido
+        texts = {}
+        ids_by_hash = {}
+        for analysis_id, text in batch:
+            text = text or ''
+            content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+            texts[content_hash] = text
+            ids_by_hash.setdefault(content_hash, []).append(analysis_id)
+
+        existing = dict(
+            EmailContent.objects.filter(content_hash__in=list(texts))
+            .values_list('content_hash', 'id')
+        )
+        EmailContent.objects.bulk_create([
+            EmailContent(
+                content_hash=content_hash,
+                data=zlib.compress(text.encode('utf-8'), 6),
+                size=len(text)
+            )
+            for content_hash, text in texts.items() if content_hash not in existing
+        ])
+        content_ids = dict(
+            EmailContent.objects.filter(content_hash__in=list(texts))
+            .values_list('content_hash', 'id')
+        )
+
+        for content_hash, analysis_ids in ids_by_hash.items():
+            EmailAnalysis.objects.filter(id__in=analysis_ids).update(content_id=content_ids[content_hash])
+
+        last_id = batch[-1][0]
+
+
+def backwards(apps, schema_editor):
+    EmailAnalysis = apps.get_model('spam_detector', 'EmailAnalysis')
+
+    last_id = 0
+    while True:
+        batch = list(
+            EmailAnalysis.objects.filter(id__gt=last_id, content__isnull=False)
+            .select_related('content').order_by('id')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+
+        for analysis in batch:
+            analysis.email_content = zlib.decompress(bytes(analysis.content.data)).decode('utf-8')
+        EmailAnalysis.objects.bulk_update(batch, ['email_content'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spam_detector', '0003_email_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spam_detector', '0004_migrate_email_content'),
+    ]
+
+    operations = [
+        # Con default la columna puede volver a crearse al revertir la migración
+        migrations.AlterField(
+            model_name='emailanalysis',
+            name='email_content',
+            field=models.TextField(default='', help_text='Contenido del email analizado'),
+        ),
+        migrations.RemoveField(
+            model_name='emailanalysis',
+            name='email_content',
+        ),
+    ]
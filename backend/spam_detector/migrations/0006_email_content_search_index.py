@@ -0,0 +1,75 @@
+import zlib
+
+from django.db import migrations
+
+# DDL y carga congelados aquí (no se importa utils.search): la migración debe hacer
+# siempre lo mismo aunque el módulo cambie después.
+FTS_TABLE = 'email_analysis_fts'
+BATCH_SIZE = 1000
+
+
+def create_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "content, content='', tokenize='unicode61 remove_diacritics 2')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE email_content ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS email_content_search_idx ON email_content USING GIN (search_vector)"
+        )
+
+
+def index_contents(pairs, conn):
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, content) VALUES (%s, %s)", pairs)
+        else:
+            cursor.executemany(
+                "UPDATE email_content SET search_vector = to_tsvector('simple', %s) WHERE id = %s",
+                [(text, content_id) for content_id, text in pairs]
+            )
+
+
+def forwards(apps, schema_editor):
+    """Crea el índice de texto completo y lo llena con los contenidos existentes."""
+    if schema_editor.connection.vendor not in ('sqlite', 'postgresql'):
+        return
+
+    create_index(schema_editor)
+
+    EmailContent = apps.get_model('spam_detector', 'EmailContent')
+    last_id = 0
+    while True:
+        batch = list(
+            EmailContent.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'data')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        index_contents(
+            [(content_id, zlib.decompress(bytes(data)).decode('utf-8')) for content_id, data in batch],
+            schema_editor.connection
+        )
+        last_id = batch[-1][0]
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS email_content_search_idx")
+        schema_editor.execute("ALTER TABLE email_content DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spam_detector', '0005_remove_emailanalysis_email_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
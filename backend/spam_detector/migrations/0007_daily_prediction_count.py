@@ -0,0 +1,49 @@
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def backfill_counts(apps, schema_editor):
+    """Calcula los conteos diarios de los análisis existentes."""
+    EmailAnalysis = apps.get_model('spam_detector', 'EmailAnalysis')
+    DailyPredictionCount = apps.get_model('spam_detector', 'DailyPredictionCount')
+
+    rows = (
+        EmailAnalysis.objects.order_by()
+        .annotate(day=TruncDate('created_at', tzinfo=dt_timezone.utc))
+        .values('day', 'prediction')
+        .annotate(total=models.Count('id'))
+    )
+    DailyPredictionCount.objects.bulk_create([
+        DailyPredictionCount(day=row['day'], prediction=row['prediction'], count=row['total'])
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spam_detector', '0006_email_content_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPredictionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('prediction', models.CharField(choices=[('spam', 'SPAM'), ('ham', 'HAM')], max_length=10)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'email_analysis_daily_count',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailypredictioncount',
+            constraint=models.UniqueConstraint(fields=('day', 'prediction'), name='unique_daily_prediction_count'),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import migrations, models
+
+from spam_detector.utils.sketches import DDSketch, bucket_start
+
+
+def backfill_sketches(apps, schema_editor):
+    """Construye los sketches de los análisis existentes (worker 'backfill')."""
+    EmailAnalysis = apps.get_model('spam_detector', 'EmailAnalysis')
+    LatencySketch = apps.get_model('spam_detector', 'LatencySketch')
+    accuracy = getattr(settings, 'SKETCH_RELATIVE_ACCURACY', 0.01)
+    bucket_seconds = getattr(settings, 'SKETCH_BUCKET_SECONDS', 300)
+
+    buckets = {}
+    rows = EmailAnalysis.objects.order_by().values_list('created_at', 'latency_ms', 'confidence')
+    for created_at, latency_ms, confidence in rows.iterator(chunk_size=2000):
+        start = bucket_start(created_at, bucket_seconds)
+        for metric, value in (('latency_ms', latency_ms), ('confidence', confidence * 100)):
+            sketch = buckets.get((start, metric))
+            if sketch is None:
+                sketch = buckets[(start, metric)] = DDSketch(accuracy)
+            sketch.add(value)
+
+    LatencySketch.objects.bulk_create([
+        LatencySketch(bucket_start=start, metric=metric, worker='backfill',
+                      count=sketch.count, sketch=sketch.to_dict())
+        for (start, metric), sketch in buckets.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spam_detector', '0007_daily_prediction_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatencySketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('metric', models.CharField(choices=[('latency_ms', 'Latencia (ms)'), ('confidence', 'Confianza (%)')], max_length=20)),
+                ('worker', models.CharField(max_length=100)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('sketch', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'email_analysis_latency_sketch',
+                'ordering': ['-bucket_start'],
+                'indexes': [models.Index(fields=['metric', 'bucket_start'], name='email_analy_metric_62aa92_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='latencysketch',
+            constraint=models.UniqueConstraint(fields=('bucket_start', 'metric', 'worker'), name='unique_latency_sketch'),
+        ),
+        migrations.RunPython(backfill_sketches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def rebuild_local_counts(apps, schema_editor):
+    """Recalcula los conteos diarios por día local (TIME_ZONE) en lugar de día UTC."""
+    EmailAnalysis = apps.get_model('spam_detector', 'EmailAnalysis')
+    DailyPredictionCount = apps.get_model('spam_detector', 'DailyPredictionCount')
+
+    rows = (
+        EmailAnalysis.objects.order_by()
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .values('day', 'prediction')
+        .annotate(total=models.Count('id'))
+    )
+    DailyPredictionCount.objects.all().delete()
+    DailyPredictionCount.objects.bulk_create([
+        DailyPredictionCount(day=row['day'], prediction=row['prediction'], count=row['total'])
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spam_detector', '0008_latency_sketch'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_local_counts, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,87 @@
-from django.db import models
+import hashlib
+import uuid
+import zlib
+
+from django.db import models, transaction, IntegrityError
 from django.utils import timezone
 
+from .utils import search, sketches
+
+
+class EmailContent(models.Model):
+    """Contenido de email almacenado una sola vez (comprimido con zlib) y compartido por los análisis"""
+    
+    content_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 del texto sin comprimir")
+    data = models.BinaryField(help_text="Texto comprimido con zlib")
+    size = models.PositiveIntegerField(help_text="Longitud del texto sin comprimir (caracteres)")
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'email_content'
+    
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.size} caracteres)"
+    
+    @property
+    def text(self):
+        return self.decompress(self.data)
+    
+    @staticmethod
+    def hash_text(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def compress(text):
+        return zlib.compress(text.encode('utf-8'), 6)
+    
+    @staticmethod
+    def decompress(data):
+        return zlib.decompress(bytes(data)).decode('utf-8') if data else ''
+    
+    @classmethod
+    def store(cls, text):
+        """
+        Retorna el contenido existente con el mismo hash o lo crea (y lo indexa para búsqueda).
+        """
+        content_hash = cls.hash_text(text)
+        content = cls.objects.filter(content_hash=content_hash).only('id').first()
+        if content is not None:
+            return content
+        
+        try:
+            with transaction.atomic():
+                content = cls.objects.create(
+                    content_hash=content_hash,
+                    data=cls.compress(text),
+                    size=len(text)
+                )
+                search.index_contents([(content.id, text)])
+                return content
+        except IntegrityError:
+            # Otro proceso insertó el mismo contenido al mismo tiempo
+            return cls.objects.only('id').get(content_hash=content_hash)
+
+
+class EmailAnalysisQuerySet(models.QuerySet):
+    
+    ROW_FIELDS = ['id', 'prediction', 'confidence', 'latency_ms', 'created_at', 'ip_address', 'user_agent']
+    
+    def as_rows(self, limit=None, include_content=True):
+        """
+        Retorna los análisis como diccionarios (values()).
+        El JOIN con email_content solo se hace si se pide el contenido.
+        """
+        fields = self.ROW_FIELDS + (['content__data'] if include_content else [])
+        queryset = self.values(*fields)
+        if limit is not None:
+            queryset = queryset[:limit]
+        
+        rows = list(queryset)
+        if include_content:
+            for row in rows:
+                row['email_content'] = EmailContent.decompress(row.pop('content__data'))
+        return rows
+
 
 class EmailAnalysis(models.Model):
     """Modelo para almacenar el historial de análisis de emails"""
@@ -12,7 +93,14 @@ class EmailAnalysis(models.Model):
         (HAM, 'HAM'),
     ]
     
-    email_content = models.TextField(help_text="Contenido del email analizado")
+    content = models.ForeignKey(
+        EmailContent,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='analyses',
+        help_text="Contenido del email analizado (primeros 1000 caracteres, deduplicado)"
+    )
     prediction = models.CharField(max_length=10, choices=PREDICTION_CHOICES)
     confidence = models.FloatField(help_text="Nivel de confianza (0-1)")
     latency_ms = models.FloatField(help_text="Tiempo de respuesta en milisegundos")
@@ -20,6 +108,8 @@ class EmailAnalysis(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.CharField(max_length=500, blank=True)
     
+    objects = EmailAnalysisQuerySet.as_manager()
+    
     class Meta:
         db_table = 'email_analysis'
         ordering = ['-created_at']
@@ -31,6 +121,220 @@ class EmailAnalysis(models.Model):
     def __str__(self):
         return f"{self.prediction.upper()} - {self.confidence:.2%} ({self.created_at})"
     
+    @property
+    def email_content(self):
+        """Texto analizado (descomprimido desde EmailContent)"""
+        return self.content.text if self.content_id else ''
+    
     @property
     def confidence_percentage(self):
         return round(self.confidence * 100, 2)
+    
+    @classmethod
+    def record_prediction(cls, email_text, result, ip_address=None, user_agent=''):
+        """
+        Guarda en el historial el resultado de predict_spam.
+        Solo se registran predicciones válidas (spam/ham).
+        """
+        if result.get('prediction') not in (cls.SPAM, cls.HAM):
+            return None
+        
+        analysis = cls.objects.create(
+            content=EmailContent.store(email_text[:1000]),
+            prediction=result['prediction'],
+            confidence=result['confidence'] / 100,
+            latency_ms=result['latency'],
+            ip_address=ip_address,
+            user_agent=(user_agent or '')[:500]
+        )
+        DailyPredictionCount.increment(analysis.created_at, analysis.prediction)
+        sketches.record(analysis.created_at, analysis.latency_ms, result['confidence'])
+        return analysis
+
+
+class DailyPredictionCount(models.Model):
+    """
+    Conteos precalculados de análisis por día (zona horaria local, TIME_ZONE) y predicción.
+    Permiten paginar y filtrar el admin sin COUNT(*) sobre email_analysis.
+    """
+    
+    day = models.DateField()
+    prediction = models.CharField(max_length=10, choices=EmailAnalysis.PREDICTION_CHOICES)
+    count = models.PositiveBigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'email_analysis_daily_count'
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'prediction'], name='unique_daily_prediction_count'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.prediction}: {self.count}"
+    
+    @classmethod
+    def increment(cls, created_at, prediction, amount=1):
+        day = timezone.localdate(created_at)
+        updated = cls.objects.filter(day=day, prediction=prediction).update(count=models.F('count') + amount)
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(day=day, prediction=prediction, count=amount)
+        except IntegrityError:
+            cls.objects.filter(day=day, prediction=prediction).update(count=models.F('count') + amount)
+    
+    @classmethod
+    def total(cls, prediction=None, start_day=None, end_day=None):
+        """Suma de conteos, opcionalmente por predicción y rango de días [start_day, end_day)."""
+        queryset = cls.objects.all()
+        if prediction:
+            queryset = queryset.filter(prediction=prediction)
+        if start_day:
+            queryset = queryset.filter(day__gte=start_day)
+        if end_day:
+            queryset = queryset.filter(day__lt=end_day)
+        return queryset.aggregate(total=models.Sum('count'))['total'] or 0
+    
+    @staticmethod
+    def breakdown(queryset):
+        """Conteos {(día local, predicción): n} de un queryset de EmailAnalysis."""
+        from django.db.models.functions import TruncDate
+        
+        rows = (
+            queryset.order_by()
+            .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+            .values('day', 'prediction')
+            .annotate(total=models.Count('id'))
+        )
+        return {(row['day'], row['prediction']): row['total'] for row in rows}
+    
+    @classmethod
+    def subtract(cls, counts):
+        """Descuenta un breakdown() (p. ej. de filas archivadas) y borra los días que quedan en 0."""
+        with transaction.atomic():
+            for (day, prediction), amount in counts.items():
+                cls.objects.filter(day=day, prediction=prediction).update(count=models.F('count') - amount)
+            cls.objects.filter(count__lte=0).delete()
+    
+    @classmethod
+    def rebuild(cls):
+        """Recalcula todos los conteos desde email_analysis (para corregir desviaciones)."""
+        counts = cls.breakdown(EmailAnalysis.objects.all())
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create([
+                cls(day=day, prediction=prediction, count=total) for (day, prediction), total in counts.items()
+            ])
+
+
+class LatencySketch(models.Model):
+    """
+    Sketch de cuantiles (utils.sketches.DDSketch) de una métrica, por ventana de tiempo
+    y worker. Se combinan al consultar para obtener percentiles de cualquier rango.
+    """
+    
+    METRIC_CHOICES = [
+        ('latency_ms', 'Latencia (ms)'),
+        ('confidence', 'Confianza (%)'),
+    ]
+    
+    bucket_start = models.DateTimeField()
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    worker = models.CharField(max_length=100)
+    count = models.PositiveBigIntegerField(default=0)
+    sketch = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'email_analysis_latency_sketch'
+        ordering = ['-bucket_start']
+        constraints = [
+            models.UniqueConstraint(fields=['bucket_start', 'metric', 'worker'], name='unique_latency_sketch'),
+        ]
+        indexes = [
+            models.Index(fields=['metric', 'bucket_start']),
+        ]
+    
+    def __str__(self):
+        return f"{self.bucket_start} {self.metric} ({self.worker}): {self.count}"
+
+
+class ClassificationJob(models.Model):
+    """Trabajo asíncrono de clasificación (lote de emails o archivo comprimido)"""
+    
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En proceso'),
+        (COMPLETED, 'Completado'),
+        (FAILED, 'Fallido'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    source = models.CharField(max_length=255, blank=True, help_text="Nombre del archivo o 'batch'")
+    total_items = models.PositiveIntegerField(default=0)
+    processed_items = models.PositiveIntegerField(default=0)
+    failed_items = models.PositiveIntegerField(default=0)
+    chunk_size = models.PositiveIntegerField(default=100)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    
+    class Meta:
+        db_table = 'classification_job'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.id} - {self.status} ({self.processed_items}/{self.total_items})"
+    
+    @property
+    def progress_percentage(self):
+        if not self.total_items:
+            return 0.0
+        return round(self.processed_items / self.total_items * 100, 2)
+
+
+class JobChunk(models.Model):
+    """Fragmento de un trabajo; es la unidad de trabajo que reclama cada worker"""
+    
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En proceso'),
+        (DONE, 'Terminado'),
+        (FAILED, 'Fallido'),
+    ]
+    
+    job = models.ForeignKey(ClassificationJob, on_delete=models.CASCADE, related_name='chunks')
+    index = models.PositiveIntegerField(help_text="Posición del fragmento dentro del trabajo")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    payload = models.TextField(help_text="Emails del fragmento en JSON (se vacía al terminar)")
+    results = models.TextField(blank=True, help_text="Resultados del fragmento en JSON")
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'classification_job_chunk'
+        ordering = ['job', 'index']
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'index'], name='unique_job_chunk_index'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'locked_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_id} #{self.index} - {self.status}"
@@ -0,0 +1,38 @@
+import json
+
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(BaseRenderer):
+    """
+    Renderer JSON para los endpoints de alto tráfico.
+    Usa orjson si está instalado; si no, json de la biblioteca estándar sin indentación.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is not None:
+            return orjson.dumps(data, default=self._encoder.default, option=orjson.OPT_UTC_Z)
+        return json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+
+
+class JSONOnlyNegotiation(DefaultContentNegotiation):
+    """Omite la negociación de la respuesta: siempre el primer renderer (JSON)."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
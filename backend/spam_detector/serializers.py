@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 
@@ -29,14 +30,39 @@ class EmailFileUploadSerializer(serializers.Serializer):
     )
 
 
-class PredictionResponseSerializer(serializers.Serializer):
+class JobSubmitSerializer(serializers.Serializer):
     """
-    Serializer para la respuesta de predicción.
+    Serializer para crear trabajos asíncronos: una lista de emails o un archivo comprimido.
     """
-    prediction = serializers.CharField()
-    confidence = serializers.FloatField()
-    latency = serializers.FloatField()
-    cleaned_text = serializers.CharField(required=False)
-    spam_keywords = serializers.ListField(child=serializers.CharField(), required=False)  # Added spam_keywords field
-    error = serializers.CharField(required=False)
+    emails = serializers.ListField(
+        child=serializers.CharField(min_length=10, max_length=50000),
+        required=False,
+        allow_empty=False
+    )
+    file = serializers.FileField(required=False)
+    
+    def validate(self, attrs):
+        if bool(attrs.get('emails')) == bool(attrs.get('file')):
+            raise serializers.ValidationError('Envía el campo emails o el campo file (solo uno).')
+        return attrs
+
 
+class ExplainSerializer(serializers.Serializer):
+    """
+    Serializer para explicaciones por token: un email (email_text) o un lote (emails).
+    """
+    email_text = serializers.CharField(min_length=10, max_length=50000, required=False)
+    emails = serializers.ListField(
+        child=serializers.CharField(min_length=10, max_length=50000),
+        required=False,
+        allow_empty=False
+    )
+    top_k = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    
+    def validate(self, attrs):
+        if bool(attrs.get('emails')) == bool(attrs.get('email_text')):
+            raise serializers.ValidationError('Envía el campo email_text o el campo emails (solo uno).')
+        max_batch = getattr(settings, 'EXPLAIN_MAX_BATCH', 100)
+        if len(attrs.get('emails') or ()) > max_batch:
+            raise serializers.ValidationError(f'Máximo {max_batch} emails por solicitud.')
+        return attrs
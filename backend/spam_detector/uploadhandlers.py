@@ -0,0 +1,75 @@
+"""
+Upload handler de /api/analyze-file/: decodifica el inmail mientras llega, sin
+guardarlo en memoria ni en un archivo temporal (ver utils.inmail.InmailStreamDecoder).
+"""
+
+import io
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+from .utils.inmail import InmailStreamDecoder
+
+# Margen para las cabeceras multipart y otros campos del formulario
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class StreamedInmail(UploadedFile):
+    """Archivo subido ya decodificado: read() retorna el texto (str)."""
+
+    def __init__(self, name, size, content_type, decoder):
+        text = decoder.close()
+        super().__init__(io.StringIO(text), name, content_type, size, decoder.encoding)
+        self.text = text
+        self.truncated = decoder.truncated
+        self.skipped_bytes = decoder.skipped_bytes
+
+
+class InmailStreamingUploadHandler(FileUploadHandler):
+    """
+    Entrega cada chunk del campo `file` al decodificador incremental y descarta el resto.
+    Con más de INMAIL_MAX_UPLOAD_BYTES corta la subida (too_large=True): por
+    Content-Length antes de leer el cuerpo, o al superar el límite mientras llega.
+    """
+
+    def __init__(self, request=None, field_name='file'):
+        super().__init__(request)
+        self.field_name_to_decode = field_name
+        self.max_bytes = getattr(settings, 'INMAIL_MAX_UPLOAD_BYTES', 25 * 1024 * 1024)
+        self.max_text_chars = getattr(settings, 'INMAIL_MAX_TEXT_CHARS', 100000)
+        self.too_large = False
+        self.decoder = None
+        self.received = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > self.max_bytes + MULTIPART_OVERHEAD_BYTES:
+            # Formulario vacío sin leer el cuerpo; la vista responde 413
+            self.too_large = True
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+        if field_name == self.field_name_to_decode:
+            self.decoder = InmailStreamDecoder(self.max_text_chars)
+        else:
+            self.decoder = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.too_large = True
+            raise StopUpload(connection_reset=True)
+        if self.decoder is not None:
+            self.decoder.feed(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.decoder is None:
+            return None
+        decoder, self.decoder = self.decoder, None
+        return StreamedInmail(self.file_name, file_size, self.content_type, decoder)
@@ -2,9 +2,15 @@ from django.urls import path
 from .views import (
     SpamDetectorAPIView, 
     SpamDetectorFileAPIView,
+    ExplainAPIView,
+    ReadinessAPIView,
+    ProfileAPIView,
     StatisticsAPIView,
     HistoryAPIView,
-    ExportAPIView
+    ExportAPIView,
+    JobSubmitAPIView,
+    JobDetailAPIView,
+    JobResultsAPIView
 )
 
 app_name = 'spam_detector'
@@ -13,9 +19,17 @@ urlpatterns = [
     # Endpoints principales
     path('api/analyze/', SpamDetectorAPIView.as_view(), name='api_analyze'),
     path('api/health/', SpamDetectorAPIView.as_view(), name='api_health'),
+    path('api/ready/', ReadinessAPIView.as_view(), name='api_ready'),
+    path('api/profile/', ProfileAPIView.as_view(), name='api_profile'),
     path('api/analyze-file/', SpamDetectorFileAPIView.as_view(), name='api_analyze_file'),
+    path('api/explain/', ExplainAPIView.as_view(), name='api_explain'),
     
     path('api/statistics/', StatisticsAPIView.as_view(), name='api_statistics'),
     path('api/history/', HistoryAPIView.as_view(), name='api_history'),
     path('api/export/', ExportAPIView.as_view(), name='api_export'),
+    
+    # Trabajos asíncronos (procesados por manage.py run_job_worker)
+    path('api/jobs/', JobSubmitAPIView.as_view(), name='api_jobs'),
+    path('api/jobs/<uuid:job_id>/', JobDetailAPIView.as_view(), name='api_job_detail'),
+    path('api/jobs/<uuid:job_id>/results/', JobResultsAPIView.as_view(), name='api_job_results'),
 ]
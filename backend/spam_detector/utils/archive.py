@@ -0,0 +1,228 @@
+"""
+Archivo histórico de EmailAnalysis particionado por día (UTC).
+
+Las filas antiguas se mueven de la tabla caliente a archivos por día:
+Parquet (columnar) si pyarrow está instalado, o NDJSON comprimido con gzip.
+"""
+
+import glob
+import gzip
+import json
+import os
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.functions import TruncDate
+
+from spam_detector.models import DailyPredictionCount, EmailAnalysis, EmailContent
+from . import search
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+_PREFIX = 'email_analysis-'
+
+
+def archive_dir():
+    return str(getattr(settings, 'ANALYSIS_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archive')))
+
+
+def default_format():
+    return 'parquet' if pyarrow is not None else 'ndjson'
+
+
+def _day_bounds(day):
+    start = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def archived_days():
+    """
+    Retorna {fecha: [rutas]} de los días presentes en el archivo histórico.
+    """
+    days = {}
+    for path in glob.glob(os.path.join(archive_dir(), f'{_PREFIX}*')):
+        if path.endswith('.tmp'):
+            continue
+        stamp = os.path.basename(path)[len(_PREFIX):len(_PREFIX) + 10]
+        try:
+            day = datetime.strptime(stamp, '%Y-%m-%d').date()
+        except ValueError:
+            continue
+        days.setdefault(day, []).append(path)
+    return days
+
+
+class _DayWriter:
+    """
+    Escribe un archivo parcial para un día. Cada ejecución crea su propio archivo
+    (email_analysis-AAAA-MM-DD.<marca>.<ext>), que solo aparece al cerrarse.
+    """
+
+    def __init__(self, day, fmt):
+        os.makedirs(archive_dir(), exist_ok=True)
+        extension = 'parquet' if fmt == 'parquet' else 'ndjson.gz'
+        stamp = datetime.now(dt_timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        self.fmt = fmt
+        self.path = os.path.join(archive_dir(), f"{_PREFIX}{day.isoformat()}.{stamp}.{extension}")
+        self.tmp_path = f"{self.path}.tmp"
+        self._writer = None
+        self._file = None
+
+    def write(self, rows):
+        if self.fmt == 'parquet':
+            table = pyarrow.Table.from_pylist(rows)
+            if self._writer is None:
+                self._writer = pyarrow.parquet.ParquetWriter(self.tmp_path, table.schema, compression='zstd')
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            if self._file is None:
+                self._file = gzip.open(self.tmp_path, 'wt', encoding='utf-8')
+            for row in rows:
+                row = dict(row, created_at=row['created_at'].isoformat())
+                self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.replace(self.tmp_path, self.path)
+            return self.path
+        return None
+
+
+def _read_file(path):
+    if path.endswith('.parquet'):
+        if pyarrow is None:
+            raise RuntimeError(f'Se requiere pyarrow para leer {path}')
+        return pyarrow.parquet.read_table(path).to_pylist()
+
+    rows = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                row['created_at'] = datetime.fromisoformat(row['created_at'])
+                rows.append(row)
+    return rows
+
+
+def read_archived_day(day, paths=None):
+    """
+    Lee todas las filas archivadas de un día, sin duplicados, ordenadas por fecha descendente.
+    """
+    paths = paths if paths is not None else archived_days().get(day, [])
+    by_id = {}
+    for path in paths:
+        for row in _read_file(path):
+            by_id[row['id']] = row
+    return sorted(by_id.values(), key=lambda r: r['created_at'], reverse=True)
+
+
+def iter_archived(start=None, end=None):
+    """
+    Recorre las filas archivadas en [start, end), del día más reciente al más antiguo.
+    """
+    for day, paths in sorted(archived_days().items(), reverse=True):
+        day_start, day_end = _day_bounds(day)
+        if (start and day_end <= start) or (end and day_start >= end):
+            continue
+        for row in read_archived_day(day, paths):
+            if (start and row['created_at'] < start) or (end and row['created_at'] >= end):
+                continue
+            yield row
+
+
+def archive_older_than(retention_days, batch_size=1000, fmt=None, log=print):
+    """
+    Mueve al archivo histórico las filas de días completos anteriores a la retención.
+
+    Por cada día: primero se exporta completo (hasta un id máximo fijado al inicio)
+    y solo después se borra de la tabla caliente en lotes de `batch_size`, para no
+    mantener bloqueos largos. Si el proceso se interrumpe entre ambas fases, las
+    filas duplicadas se descartan por id al leer.
+
+    Returns:
+        dict: {'days': n, 'archived': n, 'deleted': n, 'contents_deleted': n}
+    """
+    fmt = fmt or default_format()
+    if fmt == 'parquet' and pyarrow is None:
+        raise RuntimeError('El formato parquet requiere pyarrow')
+
+    today = datetime.now(dt_timezone.utc).date()
+    cutoff, _ = _day_bounds(today - timedelta(days=retention_days))
+
+    old_rows = EmailAnalysis.objects.filter(created_at__lt=cutoff)
+    days = (
+        old_rows.annotate(day=TruncDate('created_at', tzinfo=dt_timezone.utc))
+        .values_list('day', flat=True).distinct().order_by('day')
+    )
+
+    summary = {'days': 0, 'archived': 0, 'deleted': 0}
+    for day in list(days):
+        day_start, day_end = _day_bounds(day)
+        day_rows = EmailAnalysis.objects.filter(created_at__gte=day_start, created_at__lt=day_end)
+        max_id = day_rows.aggregate(Max('id'))['id__max']
+        if max_id is None:
+            continue
+        day_rows = day_rows.filter(id__lte=max_id)
+
+        # Fase 1: exportar por lotes usando paginación por id
+        writer = _DayWriter(day, fmt)
+        last_id = 0
+        archived = 0
+        while True:
+            batch = day_rows.filter(id__gt=last_id).order_by('id').as_rows(limit=batch_size)
+            if not batch:
+                break
+            writer.write(batch)
+            archived += len(batch)
+            last_id = batch[-1]['id']
+        writer.close()
+
+        # Los conteos son por día local: descontar lo que se borra de cada uno
+        counts = DailyPredictionCount.breakdown(day_rows)
+        
+        # Fase 2: borrar en lotes acotados
+        deleted = 0
+        while True:
+            ids = list(day_rows.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            count, _ = EmailAnalysis.objects.filter(id__in=ids).delete()
+            deleted += count
+
+        DailyPredictionCount.subtract(counts)
+
+        log(f"{day.isoformat()}: {archived} filas archivadas, {deleted} eliminadas")
+        summary['days'] += 1
+        summary['archived'] += archived
+        summary['deleted'] += deleted
+
+    summary['contents_deleted'] = delete_orphan_contents(batch_size)
+    return summary
+
+
+def delete_orphan_contents(batch_size=1000):
+    """Elimina en lotes los contenidos que ya no referencia ningún análisis."""
+    deleted = 0
+    while True:
+        orphans = list(
+            EmailContent.objects.filter(analyses__isnull=True).values_list('id', 'data')[:batch_size]
+        )
+        if not orphans:
+            return deleted
+        with transaction.atomic():
+            search.unindex_contents([
+                (content_id, EmailContent.decompress(data)) for content_id, data in orphans
+            ])
+            count, _ = EmailContent.objects.filter(id__in=[content_id for content_id, _ in orphans]).delete()
+        deleted += count
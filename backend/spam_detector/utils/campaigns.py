@@ -0,0 +1,220 @@
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Primo de Mersenne 2^31 - 1: con hashes de 32 bits el producto a*h+b cabe en uint64
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+
+class _CampaignEntry:
+    """Email ya clasificado que representa a una campaña dentro del índice."""
+    __slots__ = ('key', 'signature', 'verdict', 'campaign_id', 'hits', 'last_seen')
+
+    def __init__(self, key, signature, verdict, campaign_id, last_seen):
+        self.key = key
+        self.signature = signature
+        self.verdict = verdict
+        self.campaign_id = campaign_id
+        self.hits = 0
+        self.last_seen = last_seen
+
+
+class CampaignIndex:
+    """
+    Índice MinHash/LSH en memoria para detectar campañas de spam casi duplicadas.
+
+    Cada email se representa por el conjunto de tokens que produce Parser.parse.
+    La firma MinHash se divide en bandas; dos emails que coinciden en al menos
+    una banda son candidatos y se confirman con la similitud Jaccard estimada.
+    El índice está acotado en tamaño (LRU) y en tiempo (TTL).
+    """
+
+    def __init__(self, num_perm=128, bands=16, threshold=0.8,
+                 max_entries=10000, ttl_seconds=3600, min_tokens=5, seed=42):
+        if num_perm % bands != 0:
+            raise ValueError('num_perm debe ser múltiplo de bands')
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=(num_perm, 1)).astype(np.uint64)
+
+        self._entries = OrderedDict()
+        self._buckets = [dict() for _ in range(bands)]
+        self._lock = threading.Lock()
+        self._next_key = 0
+
+    def signature(self, tokens):
+        """
+        Calcula la firma MinHash de un conjunto de tokens.
+        Retorna None si el email es demasiado corto para compararlo con fiabilidad.
+        """
+        if len(tokens) < self.min_tokens:
+            return None
+
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode('utf-8')) for token in tokens),
+            dtype=np.uint64,
+            count=len(tokens)
+        )
+        permuted = (self._a * hashes + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def lookup(self, signature, now=None):
+        """
+        Busca una campaña casi idéntica a la firma dada.
+
+        Returns:
+            tuple | None: (veredicto cacheado, campaign_id, similitud) o None
+        """
+        if signature is None:
+            return None
+
+        now = time.time() if now is None else now
+
+        with self._lock:
+            self._evict_expired(now)
+
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+
+            best = None
+            best_similarity = 0.0
+            for key in candidates:
+                entry = self._entries[key]
+                similarity = float(np.count_nonzero(entry.signature == signature)) / self.num_perm
+                if similarity >= self.threshold and similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+
+            if best is None:
+                return None
+
+            best.hits += 1
+            best.last_seen = now
+            self._entries.move_to_end(best.key)
+            return dict(best.verdict), best.campaign_id, best_similarity
+
+    def add(self, signature, verdict, now=None):
+        """
+        Registra el veredicto de un email recién clasificado por el modelo.
+
+        Returns:
+            str | None: campaign_id asignado
+        """
+        if signature is None:
+            return None
+
+        now = time.time() if now is None else now
+        campaign_id = hashlib.blake2b(signature.tobytes(), digest_size=6).hexdigest()
+
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+
+            entry = _CampaignEntry(key, signature, dict(verdict), campaign_id, now)
+            self._entries[key] = entry
+            for band, band_key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+
+            self._evict_expired(now)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+        return campaign_id
+
+    def cluster_sizes(self, limit=10):
+        """
+        Retorna las campañas activas más grandes (email original + duplicados).
+        """
+        with self._lock:
+            self._evict_expired(time.time())
+            clusters = [
+                {
+                    'campaign_id': entry.campaign_id,
+                    'size': entry.hits + 1,
+                    'prediction': entry.verdict.get('prediction'),
+                }
+                for entry in self._entries.values()
+                if entry.hits > 0
+            ]
+            tracked = len(self._entries)
+
+        clusters.sort(key=lambda c: c['size'], reverse=True)
+        return {
+            'tracked_emails': tracked,
+            'active_campaigns': len(clusters),
+            'duplicates_matched': sum(c['size'] - 1 for c in clusters),
+            'top_campaigns': clusters[:limit],
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for bucket in self._buckets:
+                bucket.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def _evict_expired(self, now):
+        # Las entradas se mantienen ordenadas por last_seen (move_to_end en cada acierto)
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.last_seen <= self.ttl_seconds:
+                break
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for band, band_key in enumerate(self._band_keys(entry.signature)):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_campaign_index():
+    """
+    Retorna el índice de campañas del proceso, o None si la detección está desactivada.
+    Se configura con las variables CAMPAIGN_LSH_* de settings.
+    """
+    global _index
+    from django.conf import settings
+
+    if not getattr(settings, 'CAMPAIGN_LSH_ENABLED', True):
+        return None
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CampaignIndex(
+                    num_perm=getattr(settings, 'CAMPAIGN_LSH_NUM_PERM', 128),
+                    bands=getattr(settings, 'CAMPAIGN_LSH_BANDS', 16),
+                    threshold=getattr(settings, 'CAMPAIGN_LSH_THRESHOLD', 0.8),
+                    max_entries=getattr(settings, 'CAMPAIGN_LSH_MAX_ENTRIES', 10000),
+                    ttl_seconds=getattr(settings, 'CAMPAIGN_LSH_TTL_SECONDS', 3600),
+                    min_tokens=getattr(settings, 'CAMPAIGN_LSH_MIN_TOKENS', 5),
+                )
+    return _index
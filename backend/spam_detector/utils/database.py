@@ -0,0 +1,90 @@
+"""
+Capa de base de datos: pragmas de SQLite al abrir cada conexión y enrutamiento
+de las lecturas analíticas a una conexión de solo lectura (réplica).
+
+Las vistas de estadísticas, historial y exportación envuelven sus lecturas con
+@use_analytics_db; el router las envía al alias 'analytics' si está configurado
+(DB_ANALYTICS_NAME) y todo lo demás, incluidas las escrituras, va a 'default'.
+"""
+
+import contextvars
+import functools
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+ANALYTICS_ALIAS = 'analytics'
+
+_analytics_reads = contextvars.ContextVar('analytics_reads', default=False)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Receptor de connection_created: aplica SQLITE_PRAGMAS a cada conexión nueva.
+    journal_mode=WAL permite que las lecturas no bloqueen a las escrituras.
+    """
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    with connection.cursor() as cursor:
+        if connection.alias == ANALYTICS_ALIAS:
+            # WAL es persistente en el archivo; una conexión de solo lectura no puede cambiarlo
+            pragmas.pop('journal_mode', None)
+            pragmas['query_only'] = 'ON'
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+
+
+def analytics_enabled():
+    return ANALYTICS_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def analytics_reads():
+    """Dentro de este bloque, las lecturas de spam_detector van a la conexión analítica."""
+    token = _analytics_reads.set(True)
+    try:
+        yield
+    finally:
+        _analytics_reads.reset(token)
+
+
+def use_analytics_db(func):
+    """Decorador para métodos de vistas que solo leen."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with analytics_reads():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def read_connection():
+    """Conexión para SQL crudo de lectura (p. ej. el índice de búsqueda)."""
+    if _analytics_reads.get() and analytics_enabled():
+        return connections[ANALYTICS_ALIAS]
+    return connections['default']
+
+
+class AnalyticsRouter:
+    """
+    Envía las lecturas analíticas al alias 'analytics'; las escrituras siempre a 'default'.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _analytics_reads.get() and analytics_enabled() and model._meta.app_label == 'spam_detector':
+            return ANALYTICS_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Ambos alias contienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == ANALYTICS_ALIAS:
+            return False
+        return None
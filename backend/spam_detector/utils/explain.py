@@ -0,0 +1,137 @@
+"""
+Explicaciones de predicciones por token para modelos lineales (Pipeline de dos pasos: vectorizador + clasificador con coef_).
+
+La contribución de un token en un email es valor × coeficiente (conteo × coef_ con
+CountVectorizer). Se calculan para todo el lote a la vez con un producto elemento a
+elemento entre la matriz dispersa y coef_, y el top-k de cada fila con argpartition.
+Las contribuciones positivas empujan hacia spam y las negativas hacia ham; su suma
+más el intercepto es el logit del modelo (decision_function).
+"""
+
+import threading
+import weakref
+from collections import namedtuple
+
+import numpy as np
+
+LinearParts = namedtuple('LinearParts', ['vectorizer', 'classifier', 'feature_names', 'coef', 'intercept', 'classes'])
+
+VECTORIZER_STEPS = ('vectorizer', 'tfidfvectorizer')
+CLASSIFIER_STEPS = ('classifier', 'logisticregression')
+
+_cache = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def linear_parts(model):
+    """
+    Extrae (y cachea por modelo) el vectorizador, el clasificador y los coeficientes
+    orientados hacia spam. None si el modelo no es un Pipeline de exactamente dos pasos
+    (vectorizador y clasificador lineal binario); en ese caso se usa model.predict_proba.
+    """
+    try:
+        return _cache[model]
+    except (KeyError, TypeError):
+        pass
+
+    parts = None
+    # Solo vectorizador -> clasificador: con cualquier paso intermedio (escalado, selección,
+    # TfidfTransformer) el clasificador no recibe la salida del vectorizador
+    steps = getattr(model, 'steps', None)
+    if steps and len(steps) == 2:
+        (vectorizer_name, vectorizer), (classifier_name, classifier) = steps
+        if vectorizer_name in VECTORIZER_STEPS and classifier_name in CLASSIFIER_STEPS \
+                and getattr(classifier, 'coef_', None) is not None and classifier.coef_.shape[0] == 1:
+            classes = list(classifier.classes_)
+            # coef_ positivo empuja hacia classes_[1]; se orienta para que positivo = spam (1)
+            sign = 1.0 if classes[1] == 1 else -1.0
+            parts = LinearParts(
+                vectorizer=vectorizer,
+                classifier=classifier,
+                feature_names=vectorizer.get_feature_names_out(),
+                coef=np.asarray(classifier.coef_[0], dtype=np.float64) * sign,
+                intercept=float(classifier.intercept_[0]) * sign,
+                classes=classes,
+            )
+
+    with _lock:
+        try:
+            _cache[model] = parts
+        except TypeError:
+            pass
+    return parts
+
+
+def _top_k(values, k):
+    """Índices de los k valores mayores, ordenados de mayor a menor."""
+    if len(values) > k:
+        candidates = np.argpartition(-values, k - 1)[:k]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+
+def _tokens(parts, columns, values):
+    # El conteo (o peso TF-IDF) se recupera dividiendo por el coeficiente, que no es 0
+    counts = values / parts.coef[columns]
+    return [
+        (str(parts.feature_names[c]), float(n), float(v))
+        for c, n, v in zip(columns, counts, values)
+    ]
+
+
+def contributions(parts, X, top_k=10):
+    """
+    Top-k contribuciones por fila de una matriz ya vectorizada.
+
+    Returns:
+        list[dict]: {'intercept', 'logit', 'spam': [(token, conteo, contribución)], 'ham': [...]}
+            'spam' en orden decreciente (más positiva primero), 'ham' de la más negativa.
+    """
+    weighted = X.multiply(parts.coef).tocsr()
+    weighted.sum_duplicates()
+    logits = np.asarray(weighted.sum(axis=1)).ravel() + parts.intercept
+
+    results = []
+    for row in range(weighted.shape[0]):
+        start, end = weighted.indptr[row], weighted.indptr[row + 1]
+        values = weighted.data[start:end]
+        columns = weighted.indices[start:end]
+
+        positive = values > 0
+        negative = values < 0
+        spam_idx = _top_k(values[positive], top_k)
+        ham_idx = _top_k(-values[negative], top_k)
+
+        results.append({
+            'intercept': parts.intercept,
+            'logit': float(logits[row]),
+            'spam': _tokens(parts, columns[positive][spam_idx], values[positive][spam_idx]),
+            'ham': _tokens(parts, columns[negative][ham_idx], values[negative][ham_idx]),
+        })
+    return results
+
+
+def explain_batch(cleaned_texts, model, top_k=10):
+    """
+    Predicción y explicación de un lote de textos ya limpiados (Parser.parse).
+
+    Returns:
+        list[dict] | None: por email {'prediction', 'confidence', 'intercept', 'logit',
+            'spam', 'ham'}; None si el modelo no es lineal.
+    """
+    parts = linear_parts(model)
+    if parts is None:
+        return None
+    if not cleaned_texts:
+        return []
+
+    X = parts.vectorizer.transform(cleaned_texts)
+    probabilities = parts.classifier.predict_proba(X)
+    best = probabilities.argmax(axis=1)
+
+    results = contributions(parts, X, top_k)
+    for result, row, best_idx in zip(results, probabilities, best):
+        result['prediction'] = 'spam' if parts.classes[best_idx] == 1 else 'ham'
+        result['confidence'] = round(float(row[best_idx]) * 100, 2)
+    return results
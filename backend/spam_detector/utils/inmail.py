@@ -0,0 +1,225 @@
+import codecs
+import os
+from email.parser import BytesHeaderParser
+
+
+# Codificaciones probadas en orden al leer archivos inmail (dataset TREC)
+INMAIL_ENCODINGS = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
+
+# Líneas más largas que esto se procesan en trozos (acota la memoria sin saltos de línea)
+STREAM_MAX_LINE_BYTES = 64 * 1024
+STREAM_MAX_HEADER_BYTES = 16 * 1024
+
+
+def decode_inmail(raw_bytes):
+    """
+    Decodifica el contenido crudo de un archivo inmail probando varias codificaciones.
+    
+    Returns:
+        str | None: Texto decodificado, o None si ninguna codificación funciona
+    """
+    for encoding in INMAIL_ENCODINGS:
+        try:
+            return raw_bytes.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+class InmailStreamDecoder:
+    """
+    Decodifica un inmail de forma incremental, a medida que llegan los bytes.
+    
+    - Decodificador incremental utf-8; ante el primer byte inválido pasa a latin-1
+      (el mismo resultado que decode_inmail, sin volver a leer el archivo).
+    - Sigue la estructura MIME por líneas: las cabeceras y las partes de texto se
+      conservan; el contenido de adjuntos (partes no text/* o con disposition
+      attachment) se descarta buscando directamente el siguiente boundary.
+    - Al juntar max_text_chars caracteres deja de procesar (truncated=True).
+    
+    La memoria queda acotada por max_text_chars más una línea, sea cual sea el tamaño.
+    """
+    
+    def __init__(self, max_text_chars=100000):
+        self.max_text_chars = max_text_chars
+        self.encoding = 'utf-8'
+        self.bytes_received = 0
+        self.skipped_bytes = 0
+        self.truncated = False
+        self.text_chars = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._text = []
+        self._carry = b''
+        self._boundaries = []
+        self._in_headers = True
+        self._headers = bytearray()
+        self._skipping = False
+    
+    def feed(self, data):
+        self.bytes_received += len(data)
+        if self.truncated:
+            self.skipped_bytes += len(data)
+            return
+        
+        buffer = self._carry + data if self._carry else data
+        self._carry = b''
+        pos = 0
+        while pos < len(buffer) and not self.truncated:
+            if self._skipping:
+                pos = self._skip(buffer, pos)
+                continue
+            end = buffer.find(b'\n', pos)
+            if end == -1:
+                rest = buffer[pos:]
+                if len(rest) > STREAM_MAX_LINE_BYTES:
+                    self._line(rest)
+                else:
+                    self._carry = rest
+                pos = len(buffer)
+                break
+            self._line(buffer[pos:end + 1])
+            pos = end + 1
+        
+        if self.truncated:
+            self.skipped_bytes += len(buffer) - pos
+    
+    def close(self):
+        """Procesa lo pendiente y retorna el texto decodificado."""
+        if self._carry and not self.truncated:
+            carry, self._carry = self._carry, b''
+            if self._skipping:
+                self.skipped_bytes += len(carry)
+            else:
+                self._line(carry)
+        try:
+            self._append(self._decoder.decode(b'', final=True))
+        except UnicodeDecodeError:
+            self._fallback(b'')
+        return ''.join(self._text)
+    
+    def _skip(self, buffer, pos):
+        """Descarta el contenido de un adjunto hasta el boundary (al inicio de línea)."""
+        marker = self._boundaries[-1]
+        search = pos
+        while True:
+            idx = buffer.find(marker, search)
+            if idx == -1:
+                break
+            if idx == pos or buffer[idx - 1] == 0x0A:
+                self.skipped_bytes += idx - pos
+                self._skipping = False
+                return idx
+            search = idx + 1
+        
+        # Conservar solo una última línea más corta que el marcador (podría ser su inicio)
+        newline = buffer.rfind(b'\n', pos)
+        tail = newline + 1 if newline != -1 else pos
+        if len(buffer) - tail < len(marker):
+            self._carry = buffer[tail:]
+            self.skipped_bytes += tail - pos
+        else:
+            self.skipped_bytes += len(buffer) - pos
+        return len(buffer)
+    
+    def _line(self, line):
+        if self._in_headers:
+            self._emit(line)
+            if len(self._headers) < STREAM_MAX_HEADER_BYTES:
+                self._headers += line
+            if not line.strip():
+                self._end_headers()
+            return
+        
+        if self._boundaries and line.startswith(b'--'):
+            stripped = line.rstrip()
+            for depth in range(len(self._boundaries) - 1, -1, -1):
+                marker = self._boundaries[depth]
+                if stripped == marker:
+                    del self._boundaries[depth + 1:]
+                    self._in_headers = True
+                    break
+                if stripped == marker + b'--':
+                    del self._boundaries[depth:]
+                    break
+        self._emit(line)
+    
+    def _end_headers(self):
+        self._in_headers = False
+        headers = BytesHeaderParser().parsebytes(bytes(self._headers))
+        self._headers = bytearray()
+        
+        if headers.get_content_maintype() == 'multipart':
+            boundary = headers.get_boundary()
+            if boundary:
+                self._boundaries.append(b'--' + boundary.encode('ascii', 'surrogateescape'))
+            return
+        # Dentro de un multipart: saltar adjuntos (el cuerpo principal siempre se conserva)
+        if self._boundaries and (
+            headers.get_content_maintype() not in ('text', 'message')
+            or headers.get_content_disposition() == 'attachment'
+        ):
+            self._skipping = True
+    
+    def _emit(self, line):
+        try:
+            text = self._decoder.decode(line)
+        except UnicodeDecodeError:
+            self._fallback(line)
+            return
+        self._append(text)
+    
+    def _fallback(self, data):
+        # Lo ya decodificado era utf-8 válido: se reinterpreta como latin-1
+        pending, _ = self._decoder.getstate()
+        previous = ''.join(self._text).encode('utf-8').decode('latin-1')
+        self._decoder = codecs.getincrementaldecoder('latin-1')()
+        self.encoding = 'latin-1'
+        self._text = []
+        self.text_chars = 0
+        self._append(previous + (pending + data).decode('latin-1'))
+    
+    def _append(self, text):
+        room = self.max_text_chars - self.text_chars
+        if len(text) > room:
+            text = text[:room]
+            self.truncated = True
+        if text:
+            self._text.append(text)
+            self.text_chars += len(text)
+
+
+def read_trec_index(index_path):
+    """
+    Lee un archivo index estilo TREC ("spam ../data/inmail.1" por línea).
+    Las rutas se resuelven relativas al directorio del index.
+    
+    Returns:
+        list[tuple]: [(ruta_absoluta, etiqueta), ...] con etiqueta 'spam' o 'ham'
+    """
+    base_dir = os.path.dirname(os.path.abspath(index_path))
+    entries = []
+    
+    with open(index_path, 'r', errors='ignore') as f:
+        for line in f:
+            parts = line.strip().split(None, 1)
+            if len(parts) < 2:
+                continue
+            label, email_path = parts[0].lower(), parts[1]
+            entries.append((os.path.normpath(os.path.join(base_dir, email_path)), label))
+    
+    return entries
+
+
+def list_directory(directory):
+    """
+    Lista recursivamente los archivos de un directorio (sin etiquetas).
+    
+    Returns:
+        list[tuple]: [(ruta_absoluta, None), ...] ordenadas por ruta
+    """
+    entries = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            entries.append((os.path.abspath(os.path.join(root, name)), None))
+    entries.sort()
+    return entries
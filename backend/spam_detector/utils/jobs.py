@@ -0,0 +1,324 @@
+import json
+import tarfile
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from spam_detector.models import ClassificationJob, JobChunk
+from .inmail import decode_inmail
+from .ml_handler import predict_spam_batch
+
+
+class JobSubmissionError(Exception):
+    """Error de validación al crear un trabajo (se responde con 400/429)."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def extract_archive(uploaded_file, max_items):
+    """
+    Extrae los emails de un archivo .zip, .tar, .tar.gz o .tgz.
+
+    Rechaza el archivo si sus miembros suman más de JOBS_MAX_ARCHIVE_BYTES sin
+    comprimir (bombas de descompresión), contando también los que se omiten.
+
+    Returns:
+        list[dict]: [{'name': ..., 'email_text': ...}, ...]
+    """
+    name = (uploaded_file.name or '').lower()
+    max_member_bytes = _setting('JOBS_MAX_MEMBER_BYTES', 5 * 1024 * 1024)
+    max_archive_bytes = _setting('JOBS_MAX_ARCHIVE_BYTES', 200 * 1024 * 1024)
+    items = []
+    total_bytes = 0
+
+    def add(member_name, raw):
+        text = decode_inmail(raw)
+        if text is not None and text.strip():
+            items.append({'name': member_name, 'email_text': text})
+        if len(items) > max_items:
+            raise JobSubmissionError(f'El archivo contiene más de {max_items} emails.')
+
+    def count(size):
+        # Tamaño declarado en el índice; zipfile y tarfile no entregan más que eso
+        nonlocal total_bytes
+        total_bytes += size
+        if total_bytes > max_archive_bytes:
+            raise JobSubmissionError(
+                f'El archivo descomprimido supera {max_archive_bytes} bytes.',
+                status_code=413
+            )
+
+    try:
+        if name.endswith('.zip'):
+            with zipfile.ZipFile(uploaded_file) as archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    count(info.file_size)
+                    if info.file_size > max_member_bytes:
+                        continue
+                    add(info.filename, archive.read(info))
+        elif name.endswith(('.tar', '.tar.gz', '.tgz')):
+            with tarfile.open(fileobj=uploaded_file, mode='r:*') as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    # En .tar.gz los miembros omitidos también se descomprimen al avanzar
+                    count(member.size)
+                    if member.size > max_member_bytes:
+                        continue
+                    add(member.name, archive.extractfile(member).read())
+        else:
+            raise JobSubmissionError('Formato no soportado. Usa .zip, .tar, .tar.gz o .tgz.')
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        raise JobSubmissionError(f'Archivo comprimido inválido: {e}')
+
+    return items
+
+
+def create_job(items, source='batch', ip_address=None, chunk_size=None):
+    """
+    Crea un trabajo y sus fragmentos. Retorna inmediatamente; el worker lo procesa después.
+    """
+    if not items:
+        raise JobSubmissionError('No hay emails para procesar.')
+
+    max_queued = _setting('JOBS_MAX_QUEUED_PER_CLIENT', 5)
+    if ip_address and max_queued:
+        queued = ClassificationJob.objects.filter(
+            ip_address=ip_address,
+            status__in=[ClassificationJob.PENDING, ClassificationJob.RUNNING]
+        ).count()
+        if queued >= max_queued:
+            raise JobSubmissionError(
+                f'Demasiados trabajos en cola para este cliente (máximo {max_queued}).',
+                status_code=429
+            )
+
+    chunk_size = chunk_size or _setting('JOBS_CHUNK_SIZE', 100)
+
+    with transaction.atomic():
+        job = ClassificationJob.objects.create(
+            source=source[:255],
+            total_items=len(items),
+            chunk_size=chunk_size,
+            ip_address=ip_address,
+        )
+        JobChunk.objects.bulk_create([
+            JobChunk(job=job, index=i, payload=json.dumps(items[start:start + chunk_size]))
+            for i, start in enumerate(range(0, len(items), chunk_size))
+        ])
+
+    return job
+
+
+def release_stale_chunks():
+    """
+    Devuelve a la cola los fragmentos de workers que murieron a mitad de proceso.
+    Los que ya agotaron JOBS_MAX_ATTEMPTS (p. ej. un email que tumba al worker) se
+    marcan como fallidos en lugar de reintentarse indefinidamente.
+
+    Returns:
+        int: fragmentos liberados o marcados como fallidos
+    """
+    timeout = timedelta(seconds=_setting('JOBS_CHUNK_TIMEOUT_SECONDS', 600))
+    max_attempts = _setting('JOBS_MAX_ATTEMPTS', 3)
+    stale = JobChunk.objects.filter(
+        status=JobChunk.RUNNING,
+        locked_at__lt=timezone.now() - timeout
+    )
+
+    released = stale.filter(attempts__lt=max_attempts).update(status=JobChunk.PENDING, worker='', locked_at=None)
+
+    failed = 0
+    for chunk in stale.filter(attempts__gte=max_attempts).select_related('job'):
+        if fail_chunk(chunk, f'El worker no terminó el fragmento tras {chunk.attempts} intentos'):
+            failed += 1
+            finalize_job(chunk.job_id)
+
+    return released + failed
+
+
+def chunk_item_count(job, index):
+    """Número de emails del fragmento `index` de `job`."""
+    return max(0, min(job.chunk_size, job.total_items - index * job.chunk_size))
+
+
+def fail_chunk(chunk, error):
+    """
+    Marca como fallido un fragmento aún RUNNING en chunk.worker y cuenta sus emails como
+    procesados y fallidos en el trabajo. Retorna False si el fragmento ya cambió de estado
+    o de worker.
+    """
+    with transaction.atomic():
+        updated = JobChunk.objects.filter(id=chunk.id, status=JobChunk.RUNNING, worker=chunk.worker).update(
+            status=JobChunk.FAILED,
+            error=error,
+            worker='',
+            locked_at=None
+        )
+        if updated:
+            items = chunk_item_count(chunk.job, chunk.index)
+            ClassificationJob.objects.filter(id=chunk.job_id).update(
+                processed_items=F('processed_items') + items,
+                failed_items=F('failed_items') + items
+            )
+    return bool(updated)
+
+
+def claim_chunk(worker_id):
+    """
+    Reclama de forma atómica el siguiente fragmento pendiente.
+
+    Respeta JOBS_MAX_RUNNING_JOBS: solo se empiezan trabajos nuevos si hay cupo,
+    los fragmentos de trabajos ya en proceso siempre pueden reclamarse.
+    """
+    max_running = _setting('JOBS_MAX_RUNNING_JOBS', 2)
+    running = ClassificationJob.objects.filter(status=ClassificationJob.RUNNING).count()
+
+    candidates = JobChunk.objects.filter(status=JobChunk.PENDING)
+    if running >= max_running:
+        candidates = candidates.filter(job__status=ClassificationJob.RUNNING)
+    candidates = candidates.order_by('job__created_at', 'index').values_list('id', 'job_id')[:10]
+
+    for chunk_id, job_id in candidates:
+        # UPDATE condicional: solo un worker puede ganar el fragmento (funciona en SQLite y PostgreSQL)
+        claimed = JobChunk.objects.filter(id=chunk_id, status=JobChunk.PENDING).update(
+            status=JobChunk.RUNNING,
+            worker=worker_id[:100],
+            locked_at=timezone.now(),
+            attempts=F('attempts') + 1
+        )
+        if claimed:
+            ClassificationJob.objects.filter(id=job_id, status=ClassificationJob.PENDING).update(
+                status=ClassificationJob.RUNNING,
+                started_at=timezone.now()
+            )
+            return JobChunk.objects.select_related('job').get(id=chunk_id)
+
+    return None
+
+
+def process_chunk(chunk):
+    """
+    Clasifica un fragmento reclamado. Si falla, se reintenta hasta JOBS_MAX_ATTEMPTS.
+    """
+    try:
+        items = json.loads(chunk.payload)
+        predictions = predict_spam_batch([item['email_text'] for item in items])
+        results = []
+        failed = 0
+        for item, result in zip(items, predictions):
+            if result['prediction'] == 'error':
+                failed += 1
+            results.append({
+                'name': item.get('name'),
+                'prediction': result['prediction'],
+                'confidence': result['confidence'],
+                'spam_keywords': result.get('spam_keywords', []),
+                **({'error': result['error']} if 'error' in result else {})
+            })
+
+        # Si todo el lote falló (p. ej. modelo no cargado) se trata como fallo del fragmento
+        if items and failed == len(items):
+            raise RuntimeError(predictions[0].get('error', 'Error de clasificación'))
+
+        with transaction.atomic():
+            # Solo si el fragmento sigue siendo de este worker: tras JOBS_CHUNK_TIMEOUT_SECONDS
+            # release_stale_chunks pudo dárselo a otro, y el progreso se contaría dos veces
+            updated = JobChunk.objects.filter(id=chunk.id, status=JobChunk.RUNNING, worker=chunk.worker).update(
+                status=JobChunk.DONE,
+                results=json.dumps(results),
+                payload='',
+                error='',
+                locked_at=None
+            )
+            if updated:
+                ClassificationJob.objects.filter(id=chunk.job_id).update(
+                    processed_items=F('processed_items') + len(items),
+                    failed_items=F('failed_items') + failed
+                )
+
+    except Exception as e:
+        max_attempts = _setting('JOBS_MAX_ATTEMPTS', 3)
+        retry = chunk.attempts < max_attempts
+        if retry:
+            JobChunk.objects.filter(id=chunk.id, status=JobChunk.RUNNING, worker=chunk.worker).update(
+                status=JobChunk.PENDING,
+                error=str(e),
+                worker='',
+                locked_at=None
+            )
+        else:
+            fail_chunk(chunk, str(e))
+        print(f"Error procesando fragmento {chunk}: {e} ({'reintento' if retry else 'definitivo'})")
+
+    finalize_job(chunk.job_id)
+
+
+def finalize_job(job_id):
+    """Marca el trabajo como terminado cuando ya no quedan fragmentos pendientes."""
+    counts = JobChunk.objects.filter(job_id=job_id).aggregate(
+        open=Count('id', filter=Q(status__in=[JobChunk.PENDING, JobChunk.RUNNING])),
+        failed=Count('id', filter=Q(status=JobChunk.FAILED)),
+        total=Count('id')
+    )
+    if counts['open']:
+        return
+
+    now = timezone.now()
+    ttl = timedelta(hours=_setting('JOBS_RESULT_TTL_HOURS', 24))
+    all_failed = counts['failed'] == counts['total']
+    ClassificationJob.objects.filter(
+        id=job_id,
+        status__in=[ClassificationJob.PENDING, ClassificationJob.RUNNING]
+    ).update(
+        status=ClassificationJob.FAILED if all_failed else ClassificationJob.COMPLETED,
+        error=f"{counts['failed']} fragmentos fallaron" if counts['failed'] else '',
+        finished_at=now,
+        expires_at=now + ttl
+    )
+
+
+def cleanup_expired_jobs():
+    """Elimina los trabajos (y sus resultados) cuya retención expiró."""
+    deleted, _ = ClassificationJob.objects.filter(expires_at__lt=timezone.now()).delete()
+    return deleted
+
+
+def get_job_results(job, offset=0, limit=100):
+    """
+    Retorna una página de resultados de un trabajo leyendo solo los fragmentos necesarios.
+    """
+    if limit <= 0 or offset >= job.total_items:
+        return []
+
+    first = offset // job.chunk_size
+    last = (offset + limit - 1) // job.chunk_size
+    chunks = JobChunk.objects.filter(job=job, index__range=(first, last)).only(
+        'index', 'status', 'results', 'error'
+    ).order_by('index')
+
+    rows = []
+    for chunk in chunks:
+        base = chunk.index * job.chunk_size
+        if chunk.status == JobChunk.DONE:
+            chunk_rows = json.loads(chunk.results)
+        else:
+            # Fragmentos pendientes o fallidos: se reporta su estado por cada email
+            size = min(job.chunk_size, job.total_items - base)
+            chunk_rows = [{'prediction': chunk.status, 'error': chunk.error} for _ in range(size)]
+        for i, row in enumerate(chunk_rows):
+            rows.append({'position': base + i, **row})
+
+    return [row for row in rows if offset <= row['position'] < offset + limit]
@@ -1,8 +1,45 @@
+from dataclasses import dataclass, field
 from html.parser import HTMLParser
 from io import StringIO
 import re
 import time
 import numpy as np
+from .campaigns import get_campaign_index
+from .explain import contributions, explain_batch, linear_parts
+from .model_loader import get_model
+
+MODEL_NOT_LOADED = 'Modelo no cargado. Asegúrate de que modelo_spam_final.joblib exista en la raíz del proyecto.'
+
+
+@dataclass(slots=True)
+class PredictionResult:
+    """
+    Resultado de una predicción, ya con tipos y redondeo finales.
+    Las vistas lo envían tal cual, sin pasar por un serializer.
+    """
+    prediction: str
+    confidence: float = 0.0
+    latency: float = 0.0
+    spam_keywords: list = field(default_factory=list)
+    cleaned_text: str = None
+    campaign_id: str = None
+    error: str = None
+    
+    def to_dict(self):
+        """Diccionario de respuesta; los campos opcionales vacíos se omiten."""
+        data = {
+            'prediction': self.prediction,
+            'confidence': self.confidence,
+            'latency': self.latency,
+            'spam_keywords': self.spam_keywords,
+        }
+        if self.cleaned_text is not None:
+            data['cleaned_text'] = self.cleaned_text
+        if self.campaign_id is not None:
+            data['campaign_id'] = self.campaign_id
+        if self.error is not None:
+            data['error'] = self.error
+        return data
 
 
 class MLStripper(HTMLParser):
@@ -84,36 +121,11 @@ def extract_spam_keywords(email_text, model, prediction, top_n=10):
         if prediction != 'spam':
             return []
         
-        # Intentar extraer features del modelo
-        if hasattr(model, 'named_steps'):
-            # Si es un Pipeline
-            vectorizer = model.named_steps.get('vectorizer') or model.named_steps.get('tfidfvectorizer')
-            classifier = model.named_steps.get('classifier') or model.named_steps.get('logisticregression')
-            
-            if vectorizer and classifier and hasattr(classifier, 'coef_'):
-                # Obtener vocabulario y coeficientes
-                feature_names = vectorizer.get_feature_names_out()
-                coefficients = classifier.coef_[0]
-                
-                # Vectorizar el texto actual
-                text_vector = vectorizer.transform([email_text])
-                
-                # Encontrar palabras presentes en el email
-                word_indices = text_vector.nonzero()[1]
-                
-                # Obtener coeficientes de las palabras presentes
-                word_importance = []
-                for idx in word_indices:
-                    word = feature_names[idx]
-                    importance = coefficients[idx]
-                    if importance > 0:  # Solo palabras que contribuyen a spam
-                        word_importance.append((word, importance))
-                
-                # Ordenar por importancia y retornar top N
-                word_importance.sort(key=lambda x: x[1], reverse=True)
-                keywords = [word for word, _ in word_importance[:top_n]]
-                
-                return keywords
+        # Modelo lineal: top-N contribuciones positivas (conteo × coeficiente)
+        parts = linear_parts(model)
+        if parts is not None:
+            row = contributions(parts, parts.vectorizer.transform([email_text]), top_n)[0]
+            return [word for word, _, _ in row['spam']]
         
         # Si no podemos extraer del modelo, usar lista común de palabras spam
         common_spam_words = [
@@ -133,7 +145,7 @@ def extract_spam_keywords(email_text, model, prediction, top_n=10):
         return []
 
 
-def predict_spam(email_text):
+def classify_email(email_text):
     """
     Realiza predicción de spam/ham sobre un email.
     
@@ -141,24 +153,13 @@ def predict_spam(email_text):
         email_text (str): Texto del email a analizar
     
     Returns:
-        dict: {
-            'prediction': 'spam' o 'ham',
-            'confidence': float (0-100),
-            'latency': float (milisegundos),
-            'spam_keywords': list (palabras que contribuyen al spam)
-        }
+        PredictionResult: predicción, confianza (0-100), latencia (ms), palabras clave,
+        texto limpio y campaign_id (solo si el email es casi duplicado de uno reciente)
     """
-    from spam_detector.apps import SpamDetectorConfig
-    
-    # Verificar que el modelo esté cargado
-    if SpamDetectorConfig.model is None:
-        return {
-            'prediction': 'error',
-            'confidence': 0.0,
-            'latency': 0.0,
-            'spam_keywords': [],
-            'error': 'Modelo no cargado. Asegúrate de que modelo_spam_final.joblib exista en la raíz del proyecto.'
-        }
+    # Verificar que el modelo esté cargado (la primera llamada lo carga si no se precargó)
+    model = get_model()
+    if model is None:
+        return PredictionResult('error', error=MODEL_NOT_LOADED)
     
     # Medir tiempo de inicio
     start_time = time.time()
@@ -167,41 +168,150 @@ def predict_spam(email_text):
         # Preprocesar el email
         parser = Parser()
         cleaned_text = parser.parse(email_text)
+        preview = cleaned_text[:200] + '...' if len(cleaned_text) > 200 else cleaned_text
         
-        # Realizar predicción
-        prediction = SpamDetectorConfig.model.predict([cleaned_text])[0]
+        # Reutilizar el veredicto si es casi duplicado de una campaña reciente
+        campaign_index = get_campaign_index()
+        signature = None
+        if campaign_index is not None:
+            signature = campaign_index.signature(set(cleaned_text.split()))
+            match = campaign_index.lookup(signature)
+            if match is not None:
+                verdict, campaign_id, _ = match
+                return PredictionResult(
+                    verdict['prediction'],
+                    confidence=verdict['confidence'],
+                    latency=round((time.time() - start_time) * 1000, 2),
+                    spam_keywords=verdict['spam_keywords'],
+                    cleaned_text=preview,
+                    campaign_id=campaign_id,
+                )
         
-        # Obtener probabilidades (confianza)
-        probabilities = SpamDetectorConfig.model.predict_proba([cleaned_text])[0]
-        confidence = max(probabilities) * 100
+        # Modelo lineal: una sola vectorización para predicción y palabras clave
+        explained = explain_batch([cleaned_text], model, top_k=10)
+        if explained is not None:
+            explanation = explained[0]
+            prediction_label = explanation['prediction']
+            confidence = explanation['confidence']
+            spam_keywords = [word for word, _, _ in explanation['spam']] if prediction_label == 'spam' else []
+        else:
+            # Realizar predicción
+            prediction = model.predict([cleaned_text])[0]
+            
+            # Obtener probabilidades (confianza)
+            probabilities = model.predict_proba([cleaned_text])[0]
+            confidence = round(float(max(probabilities)) * 100, 2)
+            
+            # Determinar predicción
+            prediction_label = 'spam' if prediction == 1 else 'ham'
+            
+            spam_keywords = [str(word) for word in extract_spam_keywords(
+                cleaned_text, 
+                model, 
+                prediction_label,
+                top_n=10
+            )]
+        
+        # Calcular latencia
+        end_time = time.time()
+        latency = (end_time - start_time) * 1000
         
-        # Determinar predicción
-        prediction_label = 'spam' if prediction == 1 else 'ham'
+        if campaign_index is not None:
+            campaign_index.add(signature, {
+                'prediction': prediction_label,
+                'confidence': confidence,
+                'spam_keywords': spam_keywords,
+            })
         
-        spam_keywords = extract_spam_keywords(
-            cleaned_text, 
-            SpamDetectorConfig.model, 
+        return PredictionResult(
             prediction_label,
-            top_n=10
+            confidence=confidence,
+            latency=round(latency, 2),
+            spam_keywords=spam_keywords,
+            cleaned_text=preview,
         )
+    
+    except Exception as e:
+        return PredictionResult('error', error=str(e))
+
+
+def predict_spam(email_text):
+    """
+    Igual que classify_email, pero retorna un dict: {
+        'prediction': 'spam' o 'ham',
+        'confidence': float (0-100),
+        'latency': float (milisegundos),
+        'spam_keywords': list (palabras que contribuyen al spam),
+        'campaign_id': str (solo si el email es casi duplicado de uno reciente)
+    }
+    """
+    return classify_email(email_text).to_dict()
+
+
+def predict_spam_batch(email_texts):
+    """
+    Clasifica un lote de emails con una sola llamada vectorizada al modelo.
+    Pensado para procesos offline (no usa el índice de campañas).
+    
+    Args:
+        email_texts (list[str]): Textos crudos de los emails
+    
+    Returns:
+        list[dict]: Un resultado por email, con el mismo formato que predict_spam
+    """
+    model = get_model()
+    if model is None:
+        return [{
+            'prediction': 'error',
+            'confidence': 0.0,
+            'latency': 0.0,
+            'spam_keywords': [],
+            'error': MODEL_NOT_LOADED
+        } for _ in email_texts]
+    
+    if not email_texts:
+        return []
+    
+    start_time = time.time()
+    
+    try:
+        parser = Parser()
+        cleaned_texts = [parser.parse(text) for text in email_texts]
         
-        # Calcular latencia
-        end_time = time.time()
-        latency = (end_time - start_time) * 1000
+        # Modelo lineal: predicción y palabras clave de todo el lote con una vectorización
+        explained = explain_batch(cleaned_texts, model, top_k=10)
+        if explained is not None:
+            latency = (time.time() - start_time) * 1000 / len(email_texts)
+            return [{
+                'prediction': e['prediction'],
+                'confidence': e['confidence'],
+                'latency': round(latency, 2),
+                'spam_keywords': [word for word, _, _ in e['spam']] if e['prediction'] == 'spam' else []
+            } for e in explained]
         
-        return {
-            'prediction': prediction_label,
-            'confidence': round(confidence, 2),
-            'latency': round(latency, 2),
-            'cleaned_text': cleaned_text[:200] + '...' if len(cleaned_text) > 200 else cleaned_text,
-            'spam_keywords': spam_keywords  # Add keywords to response
-        }
+        # Una sola llamada: predict equivale al argmax de predict_proba
+        probabilities = model.predict_proba(cleaned_texts)
+        classes = list(model.classes_)
+        best = probabilities.argmax(axis=1)
+        
+        latency = (time.time() - start_time) * 1000 / len(email_texts)
+        
+        results = []
+        for cleaned_text, row, best_idx in zip(cleaned_texts, probabilities, best):
+            prediction_label = 'spam' if classes[best_idx] == 1 else 'ham'
+            results.append({
+                'prediction': prediction_label,
+                'confidence': round(row[best_idx] * 100, 2),
+                'latency': round(latency, 2),
+                'spam_keywords': extract_spam_keywords(cleaned_text, model, prediction_label, top_n=10)
+            })
+        return results
     
     except Exception as e:
-        return {
+        return [{
             'prediction': 'error',
             'confidence': 0.0,
             'latency': 0.0,
             'spam_keywords': [],
             'error': str(e)
-        }
+        } for _ in email_texts]
@@ -0,0 +1,169 @@
+"""
+Carga diferida del modelo ML y calentamiento.
+
+El modelo (joblib + scikit-learn) ya no se carga en AppConfig.ready: solo los
+procesos que sirven predicciones lo cargan (wsgi.py, mta_server, classify,
+run_job_worker) o, si no se precargó, el primer request que lo necesita.
+Los comandos como migrate o shell no pagan ese costo.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+WARMUP_EMAILS = [
+    "Subject: Reunión\n\nHola equipo, les comparto la agenda de la reunión del lunes y el reporte del proyecto.",
+    "Subject: Congratulations\n\nYou are a winner! Click here to claim your free prize money now, limited offer.",
+    "Subject: Invoice\n\n<html><body><p>Please find attached the invoice for your last order.</p></body></html>",
+    "Subject: Urgent\n\nVerify your bank account password urgently or your account will be suspended. Click now.",
+]
+
+_lock = threading.RLock()
+_state = {
+    'loaded': False,
+    'attempted': False,
+    'warm': False,
+    'error': None,
+    'model_path': None,
+    'model_version': None,
+    'sklearn_version': None,
+    'load_seconds': None,
+    'warmup_seconds': None,
+    'loaded_at': None,
+}
+
+
+def _file_version(path):
+    """Versión del modelo: prefijo del sha256 del archivo."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def get_model():
+    """Retorna el modelo, cargándolo la primera vez que se pide. None si no se pudo cargar."""
+    from spam_detector.apps import SpamDetectorConfig
+
+    model = SpamDetectorConfig.model
+    if model is None:
+        # load_model toma el lock: un request concurrente espera a que termine la
+        # carga en curso en lugar de ver attempted=True con el modelo aún en None
+        model = load_model()
+    return model
+
+
+def load_model(force=False):
+    """
+    Carga el modelo desde ML_MODEL_PATH una sola vez por proceso.
+
+    Returns:
+        El modelo cargado, o None si el archivo falta o está dañado (el error queda en status()).
+    """
+    from spam_detector.apps import SpamDetectorConfig
+
+    with _lock:
+        if _state['attempted'] and not force:
+            return SpamDetectorConfig.model
+
+        _state.update(attempted=True, loaded=False, warm=False, error=None)
+        model_path = str(settings.ML_MODEL_PATH)
+        _state['model_path'] = model_path
+
+        if not os.path.exists(model_path):
+            _state['error'] = f'No se encontró el modelo en {model_path}'
+            print(f"⚠️ Advertencia: {_state['error']}")
+            return None
+
+        start = time.perf_counter()
+        try:
+            import joblib
+            import sklearn
+
+            model = joblib.load(model_path)
+        except Exception as e:
+            _state['error'] = f'Error cargando el modelo: {e}'
+            print(f"❌ {_state['error']}")
+            return None
+
+        SpamDetectorConfig.model = model
+        _state.update(
+            loaded=True,
+            load_seconds=round(time.perf_counter() - start, 3),
+            model_version=_file_version(model_path),
+            sklearn_version=sklearn.__version__,
+            loaded_at=timezone.now().isoformat(),
+        )
+        print(f"✅ Modelo ML cargado exitosamente desde: {model_path} ({_state['load_seconds']} s)")
+        return model
+
+
+def warm_up(samples=None):
+    """
+    Clasifica emails sintéticos para inicializar cachés y rutas de código antes
+    de recibir tráfico. No pasa por el índice de campañas ni guarda historial.
+
+    Returns:
+        bool: True si el modelo quedó listo
+    """
+    from .ml_handler import Parser, extract_spam_keywords
+
+    model = get_model()
+    if model is None:
+        return False
+
+    samples = samples or getattr(settings, 'ML_WARMUP_SAMPLES', 16)
+    texts = [WARMUP_EMAILS[i % len(WARMUP_EMAILS)] for i in range(samples)]
+
+    start = time.perf_counter()
+    try:
+        parser = Parser()
+        cleaned = [parser.parse(text) for text in texts]
+        # Lote y emails individuales, como en los trabajos y en /api/analyze/
+        model.predict_proba(cleaned)
+        for text in cleaned[:len(WARMUP_EMAILS)]:
+            model.predict([text])
+            model.predict_proba([text])
+            extract_spam_keywords(text, model, 'spam')
+    except Exception as e:
+        _state.update(warm=False, error=f'Error en el calentamiento: {e}')
+        print(f"❌ {_state['error']}")
+        return False
+
+    _state.update(warm=True, warmup_seconds=round(time.perf_counter() - start, 3))
+    return True
+
+
+def ensure_ready():
+    """Carga y calienta el modelo si aún no se hizo. Retorna True si está listo."""
+    if not _state['attempted']:
+        load_model()
+    if _state['loaded'] and not _state['warm']:
+        with _lock:
+            if not _state['warm']:
+                warm_up()
+    return is_ready()
+
+
+def is_ready():
+    return _state['loaded'] and _state['warm']
+
+
+def status():
+    """Estado del modelo para el endpoint de readiness."""
+    return {
+        'ready': is_ready(),
+        'model_loaded': _state['loaded'],
+        'warm': _state['warm'],
+        'model_version': _state['model_version'],
+        'sklearn_version': _state['sklearn_version'],
+        'load_seconds': _state['load_seconds'],
+        'warmup_seconds': _state['warmup_seconds'],
+        'loaded_at': _state['loaded_at'],
+        'error': _state['error'],
+    }
@@ -0,0 +1,197 @@
+"""
+Protocolo binario para integrar el detector directamente con el MTA.
+
+Cada mensaje viaja en una trama con prefijo de longitud:
+
+    [4 bytes big-endian: longitud N][N bytes: payload]
+
+El cliente envía el email crudo (bytes) en cada trama y el servidor responde,
+en el mismo orden, con una trama cuyo payload es el veredicto en JSON (UTF-8).
+Las conexiones son persistentes y admiten pipelining: el cliente puede enviar
+varias tramas sin esperar respuesta.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+
+_HEADER = struct.Struct('!I')
+
+DEFAULT_MAX_FRAME_BYTES = 10 * 1024 * 1024
+
+
+class FrameError(Exception):
+    """Trama inválida o conexión cerrada a mitad de una trama."""
+
+
+def read_frame(stream, max_bytes=DEFAULT_MAX_FRAME_BYTES):
+    """
+    Lee una trama completa de un stream binario.
+
+    Returns:
+        bytes | None: Payload de la trama, o None si el peer cerró la conexión
+    """
+    header = stream.read(_HEADER.size)
+    if not header:
+        return None
+    if len(header) < _HEADER.size:
+        raise FrameError('Cabecera de trama incompleta')
+
+    (length,) = _HEADER.unpack(header)
+    if length > max_bytes:
+        raise FrameError(f'Trama demasiado grande ({length} bytes, máximo {max_bytes})')
+
+    payload = stream.read(length)
+    if len(payload) < length:
+        raise FrameError('Trama incompleta')
+    return payload
+
+
+def write_frame(stream, payload):
+    stream.write(_HEADER.pack(len(payload)) + payload)
+
+
+class _FilterRequestHandler(socketserver.StreamRequestHandler):
+    """Atiende una conexión persistente, respondiendo cada trama en orden."""
+
+    def handle(self):
+        server = self.server
+        try:
+            while True:
+                try:
+                    payload = read_frame(self.rfile, server.max_frame_bytes)
+                except FrameError as e:
+                    write_frame(self.wfile, json.dumps({'prediction': 'error', 'error': str(e)}).encode('utf-8'))
+                    break
+                if payload is None:
+                    break
+
+                # wfile no tiene buffer: cada respuesta sale en un único send()
+                result = server.classify(payload)
+                write_frame(self.wfile, json.dumps(result).encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            if server.record:
+                from django.db import connection
+                connection.close()
+
+
+class _FilterServerMixin:
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def classify(self, payload):
+        from .inmail import decode_inmail
+        from .ml_handler import predict_spam
+
+        email_text = decode_inmail(payload)
+        if email_text is None:
+            return {'prediction': 'error', 'error': 'No se pudo decodificar el mensaje.'}
+
+        result = predict_spam(email_text)
+        if self.record:
+            from spam_detector.models import EmailAnalysis
+            try:
+                EmailAnalysis.record_prediction(email_text, result, user_agent='mta-filter')
+            except Exception as e:
+                print(f"Error saving analysis: {e}")
+
+        result.pop('cleaned_text', None)
+        return result
+
+
+class TCPFilterServer(_FilterServerMixin, socketserver.ThreadingMixIn, socketserver.TCPServer):
+    def __init__(self, address, record=True, max_frame_bytes=DEFAULT_MAX_FRAME_BYTES):
+        self.record = record
+        self.max_frame_bytes = max_frame_bytes
+        super().__init__(address, _FilterRequestHandler)
+
+
+class UnixFilterServer(_FilterServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    def __init__(self, path, record=True, max_frame_bytes=DEFAULT_MAX_FRAME_BYTES):
+        self.record = record
+        self.max_frame_bytes = max_frame_bytes
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _FilterRequestHandler)
+
+
+class FilterClient:
+    """
+    Cliente para el servidor de filtrado del MTA.
+
+    Uso:
+        with FilterClient(unix_path='/tmp/spam-filter.sock') as client:
+            verdict = client.classify(raw_bytes)
+            verdicts = client.classify_many([raw1, raw2, raw3])
+    """
+
+    def __init__(self, host=None, port=None, unix_path=None, timeout=30):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host or '127.0.0.1', port), timeout=timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile('rb')
+        self.wfile = self.sock.makefile('wb')
+
+    def classify(self, message):
+        return self.classify_many([message])[0]
+
+    def classify_many(self, messages, window=64):
+        """
+        Envía los mensajes en pipeline, con un máximo de `window` tramas sin respuesta.
+        Las respuestas llegan en el mismo orden en que se enviaron los mensajes.
+        """
+        messages = [m.encode('utf-8') if isinstance(m, str) else m for m in messages]
+        results = []
+        errors = []
+        in_flight = threading.Semaphore(window)
+
+        def reader():
+            try:
+                for _ in messages:
+                    payload = read_frame(self.rfile)
+                    if payload is None:
+                        raise FrameError('El servidor cerró la conexión')
+                    results.append(json.loads(payload.decode('utf-8')))
+                    in_flight.release()
+            except Exception as e:
+                errors.append(e)
+                # Desbloquear al escritor para que pueda terminar
+                for _ in messages:
+                    in_flight.release()
+
+        reader_thread = threading.Thread(target=reader, daemon=True)
+        reader_thread.start()
+        for message in messages:
+            in_flight.acquire()
+            if errors:
+                break
+            write_frame(self.wfile, message)
+            self.wfile.flush()
+        reader_thread.join()
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def close(self):
+        for f in (self.wfile, self.rfile):
+            try:
+                f.close()
+            except OSError:
+                pass
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
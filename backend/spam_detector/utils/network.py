@@ -0,0 +1,56 @@
+import ipaddress
+
+
+def parse_networks(values):
+    """Convierte IPs o rangos CIDR ('10.0.0.0/8') en redes; ignora los valores inválidos"""
+    networks = []
+    for value in values:
+        value = value.strip()
+        if not value:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(value, strict=False))
+        except ValueError:
+            print(f"Invalid trusted proxy address: {value}")
+    return networks
+
+
+def _is_trusted(ip, networks):
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+_trusted_cache = {}
+
+
+def trusted_proxies():
+    """Redes de settings.TRUSTED_PROXIES, parseadas una vez por valor de la configuración"""
+    from django.conf import settings
+
+    values = tuple(getattr(settings, 'TRUSTED_PROXIES', ()))
+    networks = _trusted_cache.get(values)
+    if networks is None:
+        networks = _trusted_cache[values] = parse_networks(values)
+    return networks
+
+
+def get_client_ip(request, proxies=None):
+    """
+    IP del cliente que no se puede falsificar con cabeceras: REMOTE_ADDR, salvo que
+    venga de un proxy de confianza (TRUSTED_PROXIES); entonces la dirección más a la
+    derecha de X-Forwarded-For que no sea otro proxy de confianza (las de la
+    izquierda las escribe el propio cliente).
+    """
+    proxies = trusted_proxies() if proxies is None else proxies
+    remote_addr = request.META.get('REMOTE_ADDR')
+    if not proxies or not _is_trusted(remote_addr, proxies):
+        return remote_addr
+
+    forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    for ip in reversed(forwarded):
+        if not _is_trusted(ip, proxies):
+            return ip
+    return forwarded[0] if forwarded else remote_addr
@@ -0,0 +1,37 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginador que evita COUNT(*) sobre tablas grandes.
+
+    Usa `count_hint` si se conoce (p. ej. conteos precalculados); si no, cachea el
+    conteo exacto de cada consulta durante `cache_timeout` segundos.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 count_hint=None, cache_timeout=60):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.count_hint = count_hint
+        self.cache_timeout = cache_timeout
+
+    @cached_property
+    def count(self):
+        if self.count_hint is not None:
+            return self.count_hint
+
+        try:
+            sql = str(self.object_list.query)
+        except Exception:
+            return super().count
+
+        key = 'approx-count:' + hashlib.md5(sql.encode('utf-8')).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, self.cache_timeout)
+        return count
@@ -0,0 +1,206 @@
+"""
+Perfilado por muestreo de requests en producción.
+
+- CPU: un hilo muestrea cada PROFILING_INTERVAL_MS la pila de los hilos que
+  atienden requests perfilados (sys._current_frames), sin instrumentar cada llamada.
+- Memoria: con PROFILING_TRACEMALLOC, tracemalloc se activa durante los requests
+  perfilados y se acumulan los bytes que siguen asignados al terminar, por pila.
+
+Ambos se acumulan entre requests como pilas colapsadas ("raíz;...;hoja cuenta"),
+el formato que leen flamegraph.pl y speedscope.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _short_path(filename):
+    if filename.startswith(_BASE_DIR):
+        return os.path.relpath(filename, _BASE_DIR)
+    marker = 'site-packages' + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def _frame_label(name, filename, lineno):
+    # ';' separa marcos en el formato colapsado
+    return f"{name} ({_short_path(filename)}:{lineno})".replace(';', ',')
+
+
+class StackSampler:
+    """Muestrea periódicamente las pilas de los hilos registrados."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread = None
+
+    def add(self, ident):
+        with self._lock:
+            self._threads.add(ident)
+            self._active.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+                self._thread.start()
+
+    def remove(self, ident):
+        with self._lock:
+            self._threads.discard(ident)
+            if not self._threads:
+                self._active.clear()
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            # Sin requests perfilados el hilo queda bloqueado, sin costo
+            self._active.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                idents = [ident for ident in self._threads if ident != own]
+            if not idents:
+                continue
+
+            frames = sys._current_frames()
+            collapsed = []
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is not None:
+                    collapsed.append(self._collapse(frame))
+            with self._lock:
+                for stack in collapsed:
+                    self.stacks[stack] += 1
+                self.samples += len(collapsed)
+
+    @staticmethod
+    def _collapse(frame):
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            labels.append(_frame_label(code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+
+
+class AllocationTracker:
+    """
+    Acumula, por pila, los bytes asignados durante los requests perfilados que
+    siguen vivos al terminar el request. tracemalloc solo está activo mientras
+    hay algún request perfilado, así que fuera de la muestra no tiene costo. Si
+    tracemalloc ya estaba activo (PYTHONTRACEMALLOC u otra herramienta) se usa sin
+    detenerlo al terminar.
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.stacks = Counter()
+        self.peak_bytes = 0
+        self._active = 0
+        self._started = False
+        self._lock = threading.Lock()
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+
+    def begin(self):
+        with self._lock:
+            if self._active == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started = True
+            self._active += 1
+
+    def end(self):
+        """
+        Con requests perfilados concurrentes el snapshot incluye también sus
+        asignaciones: es una aproximación por muestreo.
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        _, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self._active -= 1
+            if self._active == 0 and self._started:
+                tracemalloc.stop()
+                self._started = False
+            self.peak_bytes = max(self.peak_bytes, peak)
+            for stat in snapshot.statistics('traceback'):
+                # Traceback va del marco más antiguo al más reciente
+                stack = ';'.join(f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback)
+                self.stacks[stack] += stat.size
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.peak_bytes = 0
+
+
+class Profiler:
+    """Estado de perfilado del proceso (uno por proceso, creado por el middleware)."""
+
+    def __init__(self, interval, track_allocations=False, allocation_frames=15):
+        self.sampler = StackSampler(interval)
+        self.allocations = AllocationTracker(allocation_frames) if track_allocations else None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def profile(self, func, *args, **kwargs):
+        """Ejecuta func(*args, **kwargs) perfilando el hilo actual."""
+        ident = threading.get_ident()
+        if self.allocations is not None:
+            self.allocations.begin()
+        self.sampler.add(ident)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.sampler.remove(ident)
+            if self.allocations is not None:
+                self.allocations.end()
+            with self._lock:
+                self.requests += 1
+
+    def collapsed(self, kind='cpu'):
+        """Texto en formato de pilas colapsadas, una pila por línea."""
+        if kind == 'alloc':
+            if self.allocations is None:
+                return ''
+            source = self.allocations
+        else:
+            source = self.sampler
+        with source._lock:
+            items = sorted(source.stacks.items(), key=lambda item: item[1], reverse=True)
+        return ''.join(f"{stack} {count}\n" for stack, count in items)
+
+    def reset(self):
+        self.sampler.reset()
+        if self.allocations is not None:
+            self.allocations.reset()
+        with self._lock:
+            self.requests = 0
+
+
+_profiler = None
+
+
+def get_profiler():
+    """Profiler del proceso, o None si el perfilado está deshabilitado."""
+    return _profiler
+
+
+def set_profiler(profiler):
+    global _profiler
+    _profiler = profiler
@@ -0,0 +1,212 @@
+"""
+Índice de búsqueda de texto completo sobre el contenido de los análisis.
+
+El índice se construye sobre EmailContent (un documento por contenido único,
+rowid = EmailContent.id) y se une con email_analysis por content_id:
+
+- SQLite: tabla virtual FTS5 sin contenido (email_analysis_fts), ranking bm25.
+- PostgreSQL: columna tsvector en email_content con índice GIN, ranking ts_rank_cd.
+"""
+
+import base64
+import json
+import re
+
+from django.db import connection
+
+FTS_TABLE = 'email_analysis_fts'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _vendor(conn=None):
+    return (conn or connection).vendor
+
+
+def create_index(schema_editor):
+    """Crea la estructura del índice (usado por la migración)."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "content, content='', tokenize='unicode61 remove_diacritics 2')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE email_content ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS email_content_search_idx ON email_content USING GIN (search_vector)"
+        )
+
+
+def drop_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS email_content_search_idx")
+        schema_editor.execute("ALTER TABLE email_content DROP COLUMN IF EXISTS search_vector")
+
+
+def is_supported(conn=None):
+    return _vendor(conn) in ('sqlite', 'postgresql')
+
+
+def index_contents(pairs, conn=None):
+    """
+    Indexa contenidos recién creados.
+
+    Args:
+        pairs (list[tuple]): [(content_id, texto), ...]
+    """
+    conn = conn or connection
+    if not pairs or not is_supported(conn):
+        return
+
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, content) VALUES (%s, %s)", pairs)
+        else:
+            cursor.executemany(
+                "UPDATE email_content SET search_vector = to_tsvector('simple', %s) WHERE id = %s",
+                [(text, content_id) for content_id, text in pairs]
+            )
+
+
+def unindex_contents(pairs, conn=None):
+    """
+    Quita contenidos del índice antes de borrarlos.
+    Las tablas FTS5 sin contenido necesitan el texto original para borrar.
+    """
+    conn = conn or connection
+    if not pairs or conn.vendor != 'sqlite':
+        # En PostgreSQL el tsvector se borra junto con la fila
+        return
+
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, content) VALUES ('delete', %s, %s)",
+            pairs
+        )
+
+
+def to_fts_query(query):
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura:
+    cada palabra entre comillas, unidas con AND implícito.
+    """
+    tokens = _TOKEN_RE.findall(query.lower())
+    return ' '.join(f'"{token}"' for token in tokens)
+
+
+def matching_content_ids_sql(query, conn=None):
+    """
+    Retorna (sql, params) de una subconsulta con los ids de EmailContent que coinciden.
+    Pensado para filtrar con content_id__in=RawSQL(...).
+    """
+    conn = conn or connection
+    if conn.vendor == 'sqlite':
+        return f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [to_fts_query(query)]
+    return (
+        "SELECT id FROM email_content WHERE search_vector @@ plainto_tsquery('simple', %s)",
+        [query]
+    )
+
+
+def encode_cursor(score, content_id, analysis_id):
+    raw = json.dumps([score, content_id, analysis_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        score, content_id, analysis_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return float(score), int(content_id), int(analysis_id)
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido')
+
+
+def _ranked_contents(cursor, query, after, limit, vendor):
+    """
+    Contenidos que coinciden, ordenados por (score desc, id desc), a partir de `after`.
+    El score se calcula una vez por contenido y no por cada análisis que lo comparte.
+    """
+    if vendor == 'sqlite':
+        # bm25 es menor cuanto más relevante: score = -rank
+        sql = f"SELECT rowid, -rank AS score FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        score_expr, id_expr = '-rank', 'rowid'
+        params = [to_fts_query(query)]
+    else:
+        sql = (
+            "SELECT c.id, ts_rank_cd(c.search_vector, q) AS score "
+            "FROM email_content c, plainto_tsquery('simple', %s) q WHERE c.search_vector @@ q"
+        )
+        score_expr, id_expr = 'ts_rank_cd(c.search_vector, q)', 'c.id'
+        params = [query]
+
+    if after is not None:
+        last_score, last_content_id = after
+        sql += f" AND ({score_expr} < %s OR ({score_expr} = %s AND {id_expr} < %s))"
+        params += [last_score, last_score, last_content_id]
+
+    sql += f" ORDER BY score DESC, {id_expr} DESC LIMIT %s"
+    params.append(limit)
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+def search_analyses(query, limit=10, cursor=None, conn=None):
+    """
+    Busca análisis por contenido, ordenados por relevancia.
+
+    El orden es (score del contenido desc, id del contenido desc, id del análisis desc),
+    y la paginación es por keyset: el cursor codifica esa terna del último resultado.
+    El score puede variar ligeramente si el índice cambia entre páginas.
+
+    Returns:
+        tuple: ([(analysis_id, score), ...], next_cursor | None)
+    """
+    conn = conn or connection
+    if not is_supported(conn):
+        raise NotImplementedError(f'Búsqueda no soportada para {conn.vendor}')
+    if limit < 1 or (conn.vendor == 'sqlite' and not to_fts_query(query)):
+        return [], None
+
+    results = []
+    after = None
+    pending = None
+    if cursor:
+        last_score, last_content_id, last_analysis_id = decode_cursor(cursor)
+        after = (last_score, last_content_id)
+        # Terminar primero los análisis restantes del último contenido
+        pending = (last_content_id, last_score, last_analysis_id)
+
+    with conn.cursor() as db_cursor:
+        while len(results) <= limit:
+            if pending:
+                contents = [(pending[0], pending[1])]
+            else:
+                contents = _ranked_contents(db_cursor, query, after, limit + 1, conn.vendor)
+                if not contents:
+                    break
+
+            for content_id, score in contents:
+                sql = "SELECT id FROM email_analysis WHERE content_id = %s"
+                params = [content_id]
+                if pending:
+                    sql += " AND id < %s"
+                    params.append(pending[2])
+                sql += " ORDER BY id DESC LIMIT %s"
+                params.append(limit + 1 - len(results))
+                db_cursor.execute(sql, params)
+                results.extend((analysis_id, score, content_id) for (analysis_id,) in db_cursor.fetchall())
+
+                after = (score, content_id)
+                pending = None
+                if len(results) > limit:
+                    break
+
+    next_cursor = None
+    if results and len(results) > limit:
+        results = results[:limit]
+        analysis_id, score, content_id = results[-1]
+        next_cursor = encode_cursor(score, content_id, analysis_id)
+    return [(analysis_id, score) for analysis_id, score, _ in results], next_cursor
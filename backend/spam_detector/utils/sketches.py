@@ -0,0 +1,288 @@
+"""
+Percentiles de latencia y confianza con sketches mergeables (estilo DDSketch).
+
+Cada valor cae en el bucket logarítmico ceil(log_gamma(v)), con
+gamma = (1 + α) / (1 - α): cualquier cuantil se estima con error relativo ≤ α
+(SKETCH_RELATIVE_ACCURACY) y dos sketches se combinan sumando conteos por bucket.
+
+Cada proceso acumula en memoria un sketch por métrica y por ventana de
+SKETCH_BUCKET_SECONDS, y cada SKETCH_FLUSH_SECONDS lo combina con su fila de
+LatencySketch (una por ventana, métrica y worker). Un percentil de cualquier
+rango se responde combinando las filas de las ventanas que cubre, sin leer
+email_analysis.
+"""
+
+import atexit
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+METRICS = ('latency_ms', 'confidence')
+COMPACTED_WORKER = 'merged'
+
+
+class DDSketch:
+    """Sketch de cuantiles con error relativo acotado; valores ≤ min_value van al bucket cero."""
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-6):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('relative_accuracy debe estar entre 0 y 1')
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value, weight=1):
+        if value <= self.min_value:
+            self.zero_count += weight
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + weight
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Solo se pueden combinar sketches con la misma precisión')
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Valor del cuantil q (0-1), o None si el sketch está vacío."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0.0)
+
+        cumulative = self.zero_count
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                # Punto del bucket (gamma^(i-1), gamma^i] con error relativo ≤ α
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        indexes = sorted(self.bins)
+        return {
+            'alpha': self.relative_accuracy,
+            'min_value': self.min_value,
+            'keys': indexes,
+            'counts': [self.bins[index] for index in indexes],
+            'zero': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['alpha'], data['min_value'])
+        sketch.bins = dict(zip(data['keys'], data['counts']))
+        sketch.zero_count = data['zero']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        if sketch.count:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        return sketch
+
+
+def bucket_start(moment, bucket_seconds):
+    """Inicio (UTC) de la ventana de bucket_seconds que contiene moment."""
+    epoch = int(moment.timestamp()) // bucket_seconds * bucket_seconds
+    return datetime.fromtimestamp(epoch, tz=dt_timezone.utc)
+
+
+class SketchRecorder:
+    """
+    Sketches del proceso actual, por (ventana, métrica). Cada flush_seconds combina
+    lo acumulado desde el último guardado con la fila del worker en la base de datos
+    y vacía la memoria, así que una fila nunca cuenta dos veces el mismo valor
+    (ni tras compactar).
+    """
+
+    def __init__(self, relative_accuracy=0.01, bucket_seconds=300, flush_seconds=30):
+        self.relative_accuracy = relative_accuracy
+        self.bucket_seconds = bucket_seconds
+        self.flush_seconds = flush_seconds
+        # hostname:pid no basta: un worker reiniciado puede repetir pid
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._sketches = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, created_at, latency_ms, confidence):
+        """Registra una predicción (confianza en porcentaje 0-100)."""
+        start = bucket_start(created_at, self.bucket_seconds)
+        with self._lock:
+            for metric, value in (('latency_ms', latency_ms), ('confidence', confidence)):
+                key = (start, metric)
+                sketch = self._sketches.get(key)
+                if sketch is None:
+                    sketch = self._sketches[key] = DDSketch(self.relative_accuracy)
+                sketch.add(value)
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Guarda lo pendiente; nunca propaga errores al request."""
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = time.monotonic()
+            with self._lock:
+                pending, self._sketches = self._sketches, {}
+            for key, sketch in pending.items():
+                try:
+                    self._save(key, sketch)
+                except Exception as e:
+                    print(f"Error saving latency sketches: {e}")
+                    # Conservar para el siguiente intento
+                    with self._lock:
+                        current = self._sketches.get(key)
+                        self._sketches[key] = sketch.merge(current) if current is not None else sketch
+        finally:
+            self._flush_lock.release()
+
+    def _save(self, key, sketch):
+        from django.db import transaction
+        from ..models import LatencySketch
+
+        start, metric = key
+        with transaction.atomic():
+            row = LatencySketch.objects.select_for_update().filter(
+                bucket_start=start, metric=metric, worker=self.worker
+            ).first()
+            if row is None:
+                LatencySketch.objects.create(
+                    bucket_start=start, metric=metric, worker=self.worker,
+                    count=sketch.count, sketch=sketch.to_dict(),
+                )
+                return
+            merged = DDSketch.from_dict(row.sketch).merge(sketch)
+            row.count = merged.count
+            row.sketch = merged.to_dict()
+            row.save(update_fields=['count', 'sketch', 'updated_at'])
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    """Recorder del proceso, creado al primer uso con la configuración de settings."""
+    global _recorder
+    if _recorder is None:
+        from django.conf import settings
+
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = SketchRecorder(
+                    relative_accuracy=getattr(settings, 'SKETCH_RELATIVE_ACCURACY', 0.01),
+                    bucket_seconds=getattr(settings, 'SKETCH_BUCKET_SECONDS', 300),
+                    flush_seconds=getattr(settings, 'SKETCH_FLUSH_SECONDS', 30),
+                )
+                atexit.register(_recorder.flush)
+    return _recorder
+
+
+def record(created_at, latency_ms, confidence):
+    get_recorder().record(created_at, latency_ms, confidence)
+
+
+def merged_sketches(start=None, end=None, metrics=METRICS):
+    """
+    Combina los sketches de todos los workers y ventanas en [start, end).
+    Las ventanas parcialmente cubiertas se incluyen completas (resolución SKETCH_BUCKET_SECONDS).
+
+    Returns:
+        dict: {métrica: DDSketch}
+    """
+    from ..models import LatencySketch
+
+    # Incluir lo acumulado por este proceso desde el último guardado
+    recorder = get_recorder()
+    recorder.flush()
+
+    merged = {metric: DDSketch(recorder.relative_accuracy) for metric in metrics}
+    rows = LatencySketch.objects.filter(metric__in=metrics)
+    if start is not None:
+        rows = rows.filter(bucket_start__gte=bucket_start(start, recorder.bucket_seconds))
+    if end is not None:
+        rows = rows.filter(bucket_start__lt=end)
+    for metric, data in rows.values_list('metric', 'sketch').iterator():
+        merged[metric].merge(DDSketch.from_dict(data))
+    return merged
+
+
+def compact(before):
+    """
+    Combina en una sola fila (worker 'merged') los sketches de cada ventana y métrica
+    anteriores a `before`, ya cerradas y guardadas por todos los workers. Reduce las
+    filas que lee cada consulta sin cambiar sus resultados.
+
+    Returns:
+        int: filas eliminadas
+    """
+    from django.db import transaction
+    from ..models import LatencySketch
+
+    removed = 0
+    keys = (
+        LatencySketch.objects.filter(bucket_start__lt=before)
+        .exclude(worker=COMPACTED_WORKER)
+        .values_list('bucket_start', 'metric').distinct()
+    )
+    for start, metric in list(keys):
+        with transaction.atomic():
+            rows = list(LatencySketch.objects.select_for_update().filter(bucket_start=start, metric=metric))
+            if len(rows) < 2:
+                continue
+            merged = DDSketch.from_dict(rows[0].sketch)
+            for row in rows[1:]:
+                merged.merge(DDSketch.from_dict(row.sketch))
+            LatencySketch.objects.filter(id__in=[row.id for row in rows]).delete()
+            LatencySketch.objects.create(
+                bucket_start=start, metric=metric, worker=COMPACTED_WORKER,
+                count=merged.count, sketch=merged.to_dict(),
+            )
+            removed += len(rows) - 1
+    return removed
+
+
+def percentiles(start=None, end=None, quantiles=(0.5, 0.9, 0.95, 0.99)):
+    """
+    Returns:
+        dict: {métrica: {'count': n, 'p50': v, ...}} con valores redondeados a 2 decimales
+    """
+    result = {}
+    for metric, sketch in merged_sketches(start, end).items():
+        values = {'count': sketch.count}
+        for q in quantiles:
+            value = sketch.quantile(q)
+            values[f'p{q * 100:g}'] = round(value, 2) if value is not None else None
+        result[metric] = values
+    return result
@@ -3,12 +3,41 @@ from django.views import View
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import EmailAnalysisSerializer, EmailFileUploadSerializer, PredictionResponseSerializer
-from .utils.ml_handler import predict_spam
-from .models import EmailAnalysis
+from .serializers import EmailAnalysisSerializer, EmailFileUploadSerializer, ExplainSerializer, JobSubmitSerializer
+from .renderers import FastJSONRenderer, JSONOnlyNegotiation
+from .uploadhandlers import InmailStreamingUploadHandler
+from .utils.ml_handler import MODEL_NOT_LOADED, Parser, classify_email
+from .utils.explain import explain_batch
+from .utils.campaigns import get_campaign_index
+from .utils import jobs, search
+from .utils.archive import iter_archived
+from .utils.database import read_connection, use_analytics_db
+from .utils import model_loader, profiling, sketches
+from .utils.network import get_client_ip
+from .models import EmailAnalysis, ClassificationJob
 from django.db.models import Count, Avg
-from datetime import timedelta
+from datetime import datetime, timedelta
 from django.utils import timezone
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date, parse_datetime
+from django.http import HttpResponse
+import hmac
+
+
+def _parse_bound(value):
+    """Convierte 'YYYY-MM-DD' o ISO 8601 en datetime con zona horaria"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Fecha inválida: {value}')
+        parsed = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
 
 
 class SpamDetectorAPIView(APIView):
@@ -17,6 +46,9 @@ class SpamDetectorAPIView(APIView):
     POST /api/analyze/ - Analiza un email y retorna predicción
     """
     
+    renderer_classes = [FastJSONRenderer]
+    content_negotiation_class = JSONOnlyNegotiation
+    
     def post(self, request):
         """
         Analiza el contenido de un email y retorna la predicción.
@@ -44,26 +76,18 @@ class SpamDetectorAPIView(APIView):
         
         email_text = serializer.validated_data['email_text']
         
-        # Realizar predicción
-        result = predict_spam(email_text)
+        # Realizar predicción (el resultado ya viene tipado, no requiere serializer)
+        result = classify_email(email_text).to_dict()
         
-        if result.get('prediction') in ['spam', 'ham']:
-            try:
-                EmailAnalysis.objects.create(
-                    email_content=email_text[:1000],
-                    prediction=result['prediction'],
-                    confidence=result['confidence'] / 100,
-                    latency_ms=result['latency'],
-                    ip_address=self._get_client_ip(request),
-                    user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
-                )
-            except Exception as e:
-                print(f"Error saving analysis: {e}")
-        
-        # Validar respuesta
-        response_serializer = PredictionResponseSerializer(data=result)
-        if response_serializer.is_valid():
-            return Response(response_serializer.data, status=status.HTTP_200_OK)
+        try:
+            EmailAnalysis.record_prediction(
+                email_text,
+                result,
+                ip_address=get_client_ip(request),
+                user_agent=request.META.get('HTTP_USER_AGENT', '')
+            )
+        except Exception as e:
+            print(f"Error saving analysis: {e}")
         
         return Response(result, status=status.HTTP_200_OK)
     
@@ -76,15 +100,66 @@ class SpamDetectorAPIView(APIView):
             'message': 'Spam Detector API is running',
             'version': '1.0.0'
         })
+
+
+class ReadinessAPIView(APIView):
+    """
+    GET /api/ready/ - Readiness: 200 solo si el modelo está cargado y calentado (503 si no).
+    /api/health/ sigue siendo el liveness: responde aunque el modelo no esté listo.
+    """
     
-    def _get_client_ip(self, request):
-        """Obtiene la IP del cliente"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+    def get(self, request):
+        ready = model_loader.ensure_ready()
+        return Response(
+            model_loader.status(),
+            status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+class ProfileAPIView(APIView):
+    """
+    GET /api/profile/?kind=cpu|alloc - Pilas colapsadas acumuladas por ProfilingMiddleware
+    (para flamegraph.pl o speedscope). DELETE /api/profile/ reinicia los contadores.
+    
+    Solo para usuarios staff o con la cabecera X-Profiling-Token = PROFILING_TOKEN.
+    Responde 404 si el perfilado está deshabilitado.
+    """
+    
+    def get(self, request):
+        profiler, error = self._check_access(request)
+        if error:
+            return error
+        
+        kind = request.GET.get('kind', 'cpu')
+        if kind not in ('cpu', 'alloc'):
+            return Response({'error': 'kind debe ser cpu o alloc'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = HttpResponse(profiler.collapsed(kind), content_type='text/plain; charset=utf-8')
+        response['X-Profile-Requests'] = str(profiler.requests)
+        response['X-Profile-Samples'] = str(profiler.sampler.samples)
+        if profiler.allocations is not None:
+            response['X-Profile-Peak-Bytes'] = str(profiler.allocations.peak_bytes)
+        return response
+    
+    def delete(self, request):
+        profiler, error = self._check_access(request)
+        if error:
+            return error
+        profiler.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    def _check_access(self, request):
+        profiler = profiling.get_profiler()
+        if profiler is None:
+            return None, Response({'error': 'Perfilado deshabilitado'}, status=status.HTTP_404_NOT_FOUND)
+        
+        token = getattr(settings, 'PROFILING_TOKEN', '')
+        provided = request.META.get('HTTP_X_PROFILING_TOKEN', '')
+        if token and hmac.compare_digest(provided.encode(), token.encode()):
+            return profiler, None
+        if request.user and request.user.is_staff:
+            return profiler, None
+        return None, Response({'error': 'No autorizado'}, status=status.HTTP_403_FORBIDDEN)
 
 
 class SpamDetectorFileAPIView(APIView):
@@ -93,6 +168,16 @@ class SpamDetectorFileAPIView(APIView):
     POST /api/analyze-file/ - Analiza un archivo inmail y retorna predicción
     """
     
+    renderer_classes = [FastJSONRenderer]
+    content_negotiation_class = JSONOnlyNegotiation
+    
+    def initial(self, request, *args, **kwargs):
+        # Antes de que nada lea el cuerpo: el archivo se decodifica mientras llega,
+        # sin los handlers por defecto (memoria / archivo temporal)
+        self.upload_handler = InmailStreamingUploadHandler(request)
+        request._request.upload_handlers = [self.upload_handler]
+        super().initial(request, *args, **kwargs)
+    
     def post(self, request):
         """
         Analiza un archivo inmail (como los del dataset TREC).
@@ -105,10 +190,19 @@ class SpamDetectorFileAPIView(APIView):
             "confidence": 95.23,
             "latency": 12.45,
             "cleaned_text": "texto procesado...",
-            "filename": "inmail.1"
+            "filename": "inmail.1",
+            "truncated": true   (solo si el texto superó INMAIL_MAX_TEXT_CHARS)
         }
         """
-        serializer = EmailFileUploadSerializer(data=request.data)
+        data = request.data
+        if self.upload_handler.too_large:
+            max_mb = getattr(settings, 'INMAIL_MAX_UPLOAD_BYTES', 25 * 1024 * 1024) / (1024 * 1024)
+            return Response(
+                {'error': f'El archivo es demasiado grande (máximo {max_mb:g} MB).'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        
+        serializer = EmailFileUploadSerializer(data=data)
         
         if not serializer.is_valid():
             return Response(
@@ -119,47 +213,24 @@ class SpamDetectorFileAPIView(APIView):
         uploaded_file = serializer.validated_data['file']
         
         try:
-            # Leer el contenido del archivo con múltiples codificaciones
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            file_content = None
-            
-            for encoding in encodings:
-                try:
-                    file_content = uploaded_file.read().decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    uploaded_file.seek(0)
-                    continue
-            
-            if file_content is None:
-                return Response(
-                    {'error': 'No se pudo leer el archivo con las codificaciones soportadas.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            # Ya decodificado por el upload handler mientras llegaba
+            file_content = uploaded_file.read()
             
             # Realizar predicción
-            result = predict_spam(file_content)
+            result = classify_email(file_content).to_dict()
             result['filename'] = uploaded_file.name
+            if uploaded_file.truncated:
+                result['truncated'] = True
             
-            if result.get('prediction') in ['spam', 'ham']:
-                try:
-                    EmailAnalysis.objects.create(
-                        email_content=file_content[:1000],
-                        prediction=result['prediction'],
-                        confidence=result['confidence'] / 100,
-                        latency_ms=result['latency'],
-                        ip_address=self._get_client_ip(request),
-                        user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
-                    )
-                except Exception as e:
-                    print(f"Error saving analysis: {e}")
-            
-            # Validar respuesta
-            response_serializer = PredictionResponseSerializer(data=result)
-            if response_serializer.is_valid():
-                result_data = response_serializer.data
-                result_data['filename'] = uploaded_file.name
-                return Response(result_data, status=status.HTTP_200_OK)
+            try:
+                EmailAnalysis.record_prediction(
+                    file_content,
+                    result,
+                    ip_address=get_client_ip(request),
+                    user_agent=request.META.get('HTTP_USER_AGENT', '')
+                )
+            except Exception as e:
+                print(f"Error saving analysis: {e}")
             
             return Response(result, status=status.HTTP_200_OK)
             
@@ -168,23 +239,87 @@ class SpamDetectorFileAPIView(APIView):
                 {'error': f'Error procesando el archivo: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class ExplainAPIView(APIView):
+    """
+    POST /api/explain/ - Contribución de cada token (conteo × coeficiente) a la predicción,
+    para uno o varios emails. Positivas empujan hacia spam, negativas hacia ham.
+    No guarda los análisis en el historial.
+    """
     
-    def _get_client_ip(self, request):
-        """Obtiene la IP del cliente"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+    renderer_classes = [FastJSONRenderer]
+    content_negotiation_class = JSONOnlyNegotiation
+    
+    def post(self, request):
+        """
+        Request Body:
+        {
+            "emails": ["email 1...", "email 2..."],   (o "email_text": "...")
+            "top_k": 10
+        }
+        
+        Response:
+        {
+            "results": [{
+                "prediction": "spam",
+                "confidence": 97.1,
+                "logit": 3.52,
+                "intercept": -0.41,
+                "spam": [{"token": "free", "count": 2, "contribution": 1.84}, ...],
+                "ham": [{"token": "meeting", "count": 1, "contribution": -0.92}, ...]
+            }]
+        }
+        """
+        serializer = ExplainSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        emails = data.get('emails') or [data['email_text']]
+        
+        model = model_loader.get_model()
+        if model is None:
+            return Response({'error': MODEL_NOT_LOADED}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        parser = Parser()
+        explained = explain_batch([parser.parse(text) for text in emails], model, top_k=data['top_k'])
+        if explained is None:
+            return Response(
+                {'error': 'El modelo cargado no es lineal: no admite explicaciones por token.'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        
+        results = [{
+            'prediction': e['prediction'],
+            'confidence': e['confidence'],
+            'logit': round(e['logit'], 4),
+            'intercept': round(e['intercept'], 4),
+            'spam': [{'token': t, 'count': round(n, 4), 'contribution': round(v, 4)} for t, n, v in e['spam']],
+            'ham': [{'token': t, 'count': round(n, 4), 'contribution': round(v, 4)} for t, n, v in e['ham']],
+        } for e in explained]
+        return Response({'results': results}, status=status.HTTP_200_OK)
 
 
 class StatisticsAPIView(APIView):
     """
     GET /api/statistics/ - Obtiene estadísticas generales del sistema
+    
+    percentiles: p50/p90/p95/p99 de latencia (ms) y confianza (%) combinando los
+    sketches guardados (utils.sketches); el rango se elige con start/end
+    (YYYY-MM-DD o ISO 8601, por defecto las últimas 24 horas).
     """
     
+    @use_analytics_db
     def get(self, request):
+        try:
+            start = _parse_bound(request.GET.get('start'))
+            end = _parse_bound(request.GET.get('end'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if start is None and end is None:
+            start = timezone.now() - timedelta(hours=24)
+        
         total_analyses = EmailAnalysis.objects.count()
         spam_count = EmailAnalysis.objects.filter(prediction='spam').count()
         ham_count = EmailAnalysis.objects.filter(prediction='ham').count()
@@ -197,6 +332,10 @@ class StatisticsAPIView(APIView):
         recent_spam = recent_analyses.filter(prediction='spam').count()
         recent_ham = recent_analyses.filter(prediction='ham').count()
         
+        # Campañas casi duplicadas detectadas por este proceso
+        campaign_index = get_campaign_index()
+        campaigns = campaign_index.cluster_sizes() if campaign_index is not None else None
+        
         return Response({
             'total_analyses': total_analyses,
             'spam_count': spam_count,
@@ -209,41 +348,87 @@ class StatisticsAPIView(APIView):
                 'total': recent_analyses.count(),
                 'spam': recent_spam,
                 'ham': recent_ham
-            }
+            },
+            'percentiles': {
+                'start': start.isoformat() if start else None,
+                'end': end.isoformat() if end else None,
+                **sketches.percentiles(start, end)
+            },
+            'campaigns': campaigns
         })
 
 
 class HistoryAPIView(APIView):
     """
     GET /api/history/ - Obtiene el historial de análisis recientes
+    
+    Con ?q=texto busca en el contenido usando el índice de texto completo,
+    ordenando por relevancia; la siguiente página se pide con ?cursor=<next_cursor>.
+    Con ?preview=0 se omite email_preview y no se lee la tabla de contenidos.
     """
     
+    renderer_classes = [FastJSONRenderer]
+    content_negotiation_class = JSONOnlyNegotiation
+    
+    @use_analytics_db
     def get(self, request):
         limit = int(request.GET.get('limit', 10))
-        limit = min(limit, 50)
+        limit = max(1, min(limit, 50))
+        include_preview = request.GET.get('preview', '1') != '0'
+        query = request.GET.get('q', '').strip()
         
-        analyses = EmailAnalysis.objects.all()[:limit]
+        scores = {}
+        next_cursor = None
+        if query:
+            try:
+                matches, next_cursor = search.search_analyses(
+                    query, limit=limit, cursor=request.GET.get('cursor'), conn=read_connection()
+                )
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            except NotImplementedError as e:
+                return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+            scores = dict(matches)
+            rows = EmailAnalysis.objects.filter(id__in=list(scores)).as_rows(include_content=include_preview)
+            rows.sort(key=lambda row: (-scores[row['id']], -row['id']))
+        else:
+            rows = EmailAnalysis.objects.all().as_rows(limit=limit, include_content=include_preview)
         
-        data = [{
-            'id': analysis.id,
-            'prediction': analysis.prediction,
-            'confidence': analysis.confidence_percentage,
-            'latency': round(analysis.latency_ms, 2),
-            'created_at': analysis.created_at.isoformat(),
-            'email_preview': analysis.email_content[:100] + '...' if len(analysis.email_content) > 100 else analysis.email_content
-        } for analysis in analyses]
+        data = []
+        for row in rows:
+            item = {
+                'id': row['id'],
+                'prediction': row['prediction'],
+                'confidence': round(row['confidence'] * 100, 2),
+                'latency': round(row['latency_ms'], 2),
+                'created_at': row['created_at'].isoformat(),
+            }
+            if include_preview:
+                content = row['email_content']
+                item['email_preview'] = content[:100] + '...' if len(content) > 100 else content
+            if query:
+                item['score'] = round(scores[row['id']], 6)
+            data.append(item)
         
-        return Response({
+        response = {
             'count': len(data),
             'results': data
-        })
+        }
+        if query:
+            response['next_cursor'] = next_cursor
+        return Response(response)
 
 
 class ExportAPIView(APIView):
     """
     GET /api/export/ - Exporta estadísticas en formato JSON o CSV
+    
+    Parámetros opcionales start/end (YYYY-MM-DD o ISO 8601) acotan el rango de fechas;
+    si la tabla no alcanza el límite, se completa con los días archivados.
+    Con ?content=0 se omite el contenido y no se lee la tabla de contenidos.
     """
     
+    @use_analytics_db
     def get(self, request):
         from django.http import HttpResponse
         import csv
@@ -252,22 +437,44 @@ class ExportAPIView(APIView):
         format_type = request.GET.get('format', 'json')
         limit = int(request.GET.get('limit', 100))
         limit = min(limit, 1000)
+        include_content = request.GET.get('content', '1') != '0'
         
-        analyses = EmailAnalysis.objects.all()[:limit]
+        try:
+            start = _parse_bound(request.GET.get('start'))
+            end = _parse_bound(request.GET.get('end'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        analyses = EmailAnalysis.objects.all()
+        if start:
+            analyses = analyses.filter(created_at__gte=start)
+        if end:
+            analyses = analyses.filter(created_at__lt=end)
+        rows = analyses.as_rows(limit=limit, include_content=include_content)
+        
+        # Completar con el archivo histórico (días ya movidos fuera de la tabla)
+        if len(rows) < limit:
+            seen = {row['id'] for row in rows}
+            for row in iter_archived(start, end):
+                if row['id'] in seen:
+                    continue
+                rows.append(row)
+                if len(rows) >= limit:
+                    break
         
         if format_type == 'csv':
             output = StringIO()
             writer = csv.writer(output)
             writer.writerow(['ID', 'Predicción', 'Confianza (%)', 'Latencia (ms)', 'Fecha', 'Preview'])
             
-            for analysis in analyses:
+            for row in rows:
                 writer.writerow([
-                    analysis.id,
-                    analysis.prediction.upper(),
-                    analysis.confidence_percentage,
-                    round(analysis.latency_ms, 2),
-                    analysis.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    analysis.email_content[:100].replace('\n', ' ')
+                    row['id'],
+                    row['prediction'].upper(),
+                    round(row['confidence'] * 100, 2),
+                    round(row['latency_ms'], 2),
+                    row['created_at'].strftime('%Y-%m-%d %H:%M:%S'),
+                    row.get('email_content', '')[:100].replace('\n', ' ')
                 ])
             
             response = HttpResponse(output.getvalue(), content_type='text/csv')
@@ -275,14 +482,18 @@ class ExportAPIView(APIView):
             return response
         
         # JSON por defecto
-        data = [{
-            'id': analysis.id,
-            'prediction': analysis.prediction,
-            'confidence': analysis.confidence_percentage,
-            'latency': round(analysis.latency_ms, 2),
-            'created_at': analysis.created_at.isoformat(),
-            'email_content': analysis.email_content
-        } for analysis in analyses]
+        data = []
+        for row in rows:
+            item = {
+                'id': row['id'],
+                'prediction': row['prediction'],
+                'confidence': round(row['confidence'] * 100, 2),
+                'latency': round(row['latency_ms'], 2),
+                'created_at': row['created_at'].isoformat(),
+            }
+            if include_content:
+                item['email_content'] = row['email_content']
+            data.append(item)
         
         return Response({
             'format': 'json',
@@ -290,3 +501,107 @@ class ExportAPIView(APIView):
             'exported_at': timezone.now().isoformat(),
             'data': data
         })
+
+
+class JobSubmitAPIView(APIView):
+    """
+    POST /api/jobs/ - Crea un trabajo asíncrono de clasificación y retorna su id de inmediato
+    """
+    
+    def post(self, request):
+        """
+        Request: JSON {"emails": ["...", "..."]} o multipart/form-data con 'file'
+        (.zip, .tar, .tar.gz o .tgz con archivos inmail).
+        
+        Response (202):
+        {
+            "job_id": "uuid",
+            "status": "pending",
+            "total_items": 250,
+            "status_url": "/api/jobs/<id>/",
+            "results_url": "/api/jobs/<id>/results/"
+        }
+        """
+        serializer = JobSubmitSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(
+                {'error': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        max_items = getattr(settings, 'JOBS_MAX_ITEMS', 10000)
+        
+        try:
+            uploaded_file = serializer.validated_data.get('file')
+            if uploaded_file is not None:
+                items = jobs.extract_archive(uploaded_file, max_items)
+                source = uploaded_file.name
+            else:
+                emails = serializer.validated_data['emails']
+                if len(emails) > max_items:
+                    raise jobs.JobSubmissionError(f'Máximo {max_items} emails por trabajo.')
+                items = [{'name': str(i), 'email_text': text} for i, text in enumerate(emails)]
+                source = 'batch'
+            
+            job = jobs.create_job(items, source=source, ip_address=get_client_ip(request))
+        except jobs.JobSubmissionError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        
+        return Response({
+            'job_id': str(job.id),
+            'status': job.status,
+            'total_items': job.total_items,
+            'status_url': f'/api/jobs/{job.id}/',
+            'results_url': f'/api/jobs/{job.id}/results/'
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class JobDetailAPIView(APIView):
+    """
+    GET /api/jobs/<id>/ - Consulta el progreso de un trabajo
+    """
+    
+    def get(self, request, job_id):
+        job = get_object_or_404(ClassificationJob, id=job_id)
+        
+        return Response({
+            'job_id': str(job.id),
+            'status': job.status,
+            'source': job.source,
+            'total_items': job.total_items,
+            'processed_items': job.processed_items,
+            'failed_items': job.failed_items,
+            'progress': job.progress_percentage,
+            'error': job.error,
+            'created_at': job.created_at.isoformat(),
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+            'expires_at': job.expires_at.isoformat() if job.expires_at else None,
+        })
+
+
+class JobResultsAPIView(APIView):
+    """
+    GET /api/jobs/<id>/results/?offset=0&limit=100 - Resultados paginados de un trabajo
+    """
+    
+    def get(self, request, job_id):
+        job = get_object_or_404(ClassificationJob, id=job_id)
+        
+        offset = max(int(request.GET.get('offset', 0)), 0)
+        limit = int(request.GET.get('limit', 100))
+        limit = min(max(limit, 1), 1000)
+        
+        results = jobs.get_job_results(job, offset=offset, limit=limit)
+        next_offset = offset + limit if offset + limit < job.total_items else None
+        
+        return Response({
+            'job_id': str(job.id),
+            'status': job.status,
+            'total_items': job.total_items,
+            'offset': offset,
+            'count': len(results),
+            'next_offset': next_offset,
+            'results': results
+        })